@@ -3,7 +3,66 @@
 import random
 from typing import Optional, Union
 
-from game_data import Attack, Creature, Encounter, Player
+from game_data import (
+    FLYING,
+    GUARDIAN,
+    HASTE,
+    LIFELINK,
+    PACK_HUNTER,
+    PIERCING,
+    PROTECTOR,
+    SHIELD_WALL,
+    SPLASH,
+    Attack,
+    AttackKind,
+    Creature,
+    Encounter,
+    Player,
+    TeamView,
+)
+
+
+# Bound method of the shared module RNG (so random.seed still applies)
+_randrange = random.randrange
+
+# Orthogonal neighbours of each index on the 3x3 grid (index = row * 3 + col)
+ADJACENT: tuple[tuple[int, ...], ...] = (
+    (1, 3), (0, 2, 4), (1, 5),
+    (0, 4, 6), (1, 3, 5, 7), (2, 4, 8),
+    (3, 7), (4, 6, 8), (5, 7),
+)
+
+# Grid indices in each column, top to bottom
+COLUMN_INDICES: tuple[tuple[int, ...], ...] = ((0, 3, 6), (1, 4, 7), (2, 5, 8))
+
+
+# === TEAM ROSTER LOOKUPS ===
+
+
+def get_team_view(team: Optional[list]) -> TeamView:
+    """Get a structure-of-arrays snapshot of a team grid.
+
+    Snapshots are not kept between calls: build one where several lookups
+    are needed and drop it before the team or its units change.
+    """
+    return TeamView.from_team(team)
+
+
+def get_unit_indices(unit: Union[Creature, Player], team: Optional[list]) -> tuple[int, ...]:
+    """Get the grid indices a unit occupies on a team, in ascending order.
+
+    2x2 units occupy four indices. Returns an empty tuple if not on the team.
+    """
+    return tuple(idx for idx, u in enumerate(team or []) if u is unit)
+
+
+def count_same_type(unit: Union[Creature, Player], team: Optional[list]) -> int:
+    """Count team slots held by other units with the same name as unit.
+
+    2x2 units count once per slot they occupy.
+    """
+    name_id = unit.name_id
+    return sum(1 for u in team or [] if u is not None and u is not unit and u.name_id == name_id)
 
 
 # === PASSIVE ABILITIES ===
@@ -15,30 +74,18 @@ def check_evasion(creature: Union[Creature, Player]) -> bool:
     Evasion X%: percent chance to avoid all damage.
     Returns True if damage is evaded.
     """
-    abilities = getattr(creature, "abilities", []) or []
-    for ability in abilities:
-        if ability.startswith("Evasion"):
-            # Parse "Evasion 50%" -> 50
-            parts = ability.split()
-            if len(parts) >= 2:
-                try:
-                    percent = int(parts[1].rstrip("%"))
-                    return random.randint(1, 100) <= percent
-                except ValueError:
-                    pass
-    return False
+    percent = creature.evasion_pct
+    return percent > 0 and _randrange(100) < percent
 
 
 def check_flying(creature: Union[Creature, Player]) -> bool:
     """Check if creature has Flying ability (immune to melee damage)."""
-    abilities = getattr(creature, "abilities", []) or []
-    return "Flying" in abilities
+    return bool(creature.ability_flags & FLYING)
 
 
 def check_haste(creature: Union[Creature, Player]) -> bool:
     """Check if creature has Haste ability."""
-    abilities = getattr(creature, "abilities", []) or []
-    return "Haste" in abilities
+    return bool(creature.ability_flags & HASTE)
 
 
 def process_lifelink(attacker: Union[Creature, Player], damage_dealt: int) -> None:
@@ -46,8 +93,7 @@ def process_lifelink(attacker: Union[Creature, Player], damage_dealt: int) -> No
 
     Lifelink: whenever this creature deals damage, it gains that amount of HP.
     """
-    abilities = getattr(attacker, "abilities", []) or []
-    if "Lifelink" in abilities:
+    if attacker.ability_flags & LIFELINK:
         attacker.current_health = min(
             attacker.max_health, attacker.current_health + damage_dealt
         )
@@ -69,11 +115,8 @@ def apply_debuffs(attack: Attack, target: Union[Creature, Player]) -> list[str]:
 
     All debuffs stack and one stack is removed each time the unit attacks.
     """
-    if not hasattr(target, "debuffs") or target.debuffs is None:
-        target.debuffs = {}
-
     applied = []
-    attack_abilities = attack.abilities or []
+    attack_abilities = attack.abilities
 
     if "Weakening" in attack_abilities:
         target.debuffs["weakened"] = target.debuffs.get("weakened", 0) + 1
@@ -96,15 +139,16 @@ def clear_debuff_stacks(unit: Union[Creature, Player]) -> list[str]:
 
     Returns list of debuff names that were reduced.
     """
-    cleared = []
-    if not hasattr(unit, "debuffs") or unit.debuffs is None:
-        return cleared
+    if not unit.debuffs:
+        return []
 
-    for debuff in list(unit.debuffs.keys()):
-        unit.debuffs[debuff] -= 1
-        cleared.append(debuff)
-        if unit.debuffs[debuff] <= 0:
-            del unit.debuffs[debuff]
+    debuffs = unit.debuffs
+    cleared = list(debuffs)
+    for debuff in cleared:
+        if debuffs[debuff] > 1:
+            debuffs[debuff] -= 1
+        else:
+            del debuffs[debuff]
 
     return cleared
 
@@ -117,7 +161,7 @@ def has_piercing(attack: Attack) -> bool:
 
     Piercing: melee attacks hit all squares on the horizontal (same row) of the target.
     """
-    return "Piercing" in (attack.abilities or [])
+    return bool(attack.ability_flags & PIERCING)
 
 
 def has_splash(attack: Attack) -> bool:
@@ -126,7 +170,7 @@ def has_splash(attack: Attack) -> bool:
     Splash: ranged attacks target normally; any hit square also hits its
     orthogonally adjacent squares.
     """
-    return "Splash" in (attack.abilities or [])
+    return bool(attack.ability_flags & SPLASH)
 
 
 # === SUPPORT ABILITIES ===
@@ -138,16 +182,7 @@ def get_healing_amount(unit: Union[Creature, Player]) -> int:
     Healing X: when this creature makes a magic attack, it also heals allies
     on the same column as itself (including self) for X.
     """
-    abilities = getattr(unit, "abilities", []) or []
-    for ability in abilities:
-        if ability.startswith("Healing"):
-            parts = ability.split()
-            if len(parts) >= 2:
-                try:
-                    return int(parts[1])
-                except ValueError:
-                    pass
-    return 0
+    return unit.healing_amt
 
 
 def process_healing_ability(
@@ -167,19 +202,14 @@ def process_healing_ability(
     healed = []
 
     # Find attacker's column
-    attacker_col = None
-    for idx, unit in enumerate(team or []):
-        if unit is attacker:
-            attacker_col = idx % 3
-            break
-
-    if attacker_col is None:
+    attacker_indices = get_unit_indices(attacker, team)
+    if not attacker_indices:
         return []
+    attacker_col = attacker_indices[0] % 3
 
     # Heal all allies in same column (including self)
-    for row in range(3):
-        idx = row * 3 + attacker_col
-        ally = team[idx] if team else None
+    for idx in COLUMN_INDICES[attacker_col]:
+        ally = team[idx]
         if ally is not None:
             old_health = ally.current_health
             ally.current_health = min(ally.max_health, ally.current_health + heal_amount)
@@ -190,6 +220,25 @@ def process_healing_ability(
     return healed
 
 
+def get_adjacent_indices(unit: Union[Creature, Player], team: Optional[list]) -> set[int]:
+    """Get grid indices orthogonally adjacent to any slot the unit occupies.
+
+    Slots held by the unit itself (2x2 units) are not counted as adjacent.
+    Returns an empty set if the unit is not on the team.
+    """
+    # All indices this unit occupies (for 2x2 units)
+    unit_indices = get_unit_indices(unit, team)
+
+    # Get all adjacent indices (for all slots the unit occupies)
+    adjacent_indices = set()
+    for unit_idx in unit_indices:
+        adjacent_indices.update(ADJACENT[unit_idx])
+    # Don't count own slots as adjacent
+    adjacent_indices.difference_update(unit_indices)
+
+    return adjacent_indices
+
+
 def calculate_guardian_bonus(
     unit: Union[Creature, Player],
     encounter: Encounter,
@@ -205,37 +254,20 @@ def calculate_guardian_bonus(
     bonuses = {"defense": 0, "dodge": 0}
     team = encounter.player_team if is_player_side else encounter.enemy_team
 
-    # Find all indices this unit occupies (for 2x2 units)
-    unit_indices = set()
-    for idx, u in enumerate(team or []):
-        if u is unit:
-            unit_indices.add(idx)
-
-    if not unit_indices:
+    if not get_team_view(team).team_flags & GUARDIAN:
         return bonuses
 
-    # Get all adjacent indices (for all slots the unit occupies)
-    adjacent_indices = set()
-    for unit_idx in unit_indices:
-        row, col = unit_idx // 3, unit_idx % 3
-        for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-            nr, nc = row + dr, col + dc
-            if 0 <= nr < 3 and 0 <= nc < 3:
-                adj_idx = nr * 3 + nc
-                # Don't count own slots as adjacent
-                if adj_idx not in unit_indices:
-                    adjacent_indices.add(adj_idx)
+    adjacent_indices = get_adjacent_indices(unit, team)
 
     # Check each adjacent unit for Guardian ability (deduplicate by id)
     processed_guardians = set()
     for adj_idx in adjacent_indices:
-        adj_unit = team[adj_idx] if team else None
+        adj_unit = team[adj_idx]
         if adj_unit is not None and id(adj_unit) not in processed_guardians:
-            adj_abilities = getattr(adj_unit, "abilities", []) or []
-            if "Guardian" in adj_abilities:
+            if adj_unit.ability_flags & GUARDIAN:
                 processed_guardians.add(id(adj_unit))
-                bonuses["defense"] += int(getattr(adj_unit, "defense", 0) * 0.5)
-                bonuses["dodge"] += int(getattr(adj_unit, "dodge", 0) * 0.5)
+                bonuses["defense"] += int(adj_unit.defense * 0.5)
+                bonuses["dodge"] += int(adj_unit.dodge * 0.5)
 
     return bonuses
 
@@ -255,36 +287,19 @@ def calculate_protector_bonus(
     bonus = 0
     team = encounter.player_team if is_player_side else encounter.enemy_team
 
-    # Find all indices this unit occupies (for 2x2 units)
-    unit_indices = set()
-    for idx, u in enumerate(team or []):
-        if u is unit:
-            unit_indices.add(idx)
-
-    if not unit_indices:
+    if not get_team_view(team).team_flags & PROTECTOR:
         return bonus
 
-    # Get all adjacent indices (for all slots the unit occupies)
-    adjacent_indices = set()
-    for unit_idx in unit_indices:
-        row, col = unit_idx // 3, unit_idx % 3
-        for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-            nr, nc = row + dr, col + dc
-            if 0 <= nr < 3 and 0 <= nc < 3:
-                adj_idx = nr * 3 + nc
-                # Don't count own slots as adjacent
-                if adj_idx not in unit_indices:
-                    adjacent_indices.add(adj_idx)
+    adjacent_indices = get_adjacent_indices(unit, team)
 
     # Check each adjacent unit for Protector ability (deduplicate by id)
     processed_protectors = set()
     for adj_idx in adjacent_indices:
-        adj_unit = team[adj_idx] if team else None
+        adj_unit = team[adj_idx]
         if adj_unit is not None and id(adj_unit) not in processed_protectors:
-            adj_abilities = getattr(adj_unit, "abilities", []) or []
-            if "Protector" in adj_abilities:
+            if adj_unit.ability_flags & PROTECTOR:
                 processed_protectors.add(id(adj_unit))
-                bonus += int(getattr(adj_unit, "resistance", 0) * 0.5)
+                bonus += int(adj_unit.resistance * 0.5)
 
     return bonus
 
@@ -303,24 +318,15 @@ def calculate_shield_wall_bonus(
     """
     bonuses = {"defense": 0, "dodge": 0}
 
-    unit_abilities = getattr(unit, "abilities", []) or []
-    if "Shield Wall" not in unit_abilities:
+    if not unit.ability_flags & SHIELD_WALL:
         return bonuses
 
     team = encounter.player_team if is_player_side else encounter.enemy_team
-    unit_name = getattr(unit, "name", None)
-
-    if unit_name is None:
-        return bonuses
-
-    # Count same-type units (excluding self)
-    same_type_count = sum(
-        1 for u in (team or []) if u is not None and u is not unit and getattr(u, "name", None) == unit_name
-    )
+    same_type_count = count_same_type(unit, team)
 
     if same_type_count > 0:
-        base_defense = getattr(unit, "defense", 0)
-        base_dodge = getattr(unit, "dodge", 0)
+        base_defense = unit.defense
+        base_dodge = unit.dodge
         bonuses["defense"] = int(base_defense * 0.5 * same_type_count)
         bonuses["dodge"] = int(base_dodge * 0.5 * same_type_count)
 
@@ -341,28 +347,19 @@ def calculate_pack_hunter_bonus(
     """
     bonuses = {"melee": 0, "ranged": 0}
 
-    unit_abilities = getattr(unit, "abilities", []) or []
-    if "Pack Hunter" not in unit_abilities:
+    if not unit.ability_flags & PACK_HUNTER:
         return bonuses
 
     team = encounter.player_team if is_player_side else encounter.enemy_team
-    unit_name = getattr(unit, "name", None)
-
-    if unit_name is None:
-        return bonuses
-
-    # Count same-type units (excluding self)
-    same_type_count = sum(
-        1 for u in (team or []) if u is not None and u is not unit and getattr(u, "name", None) == unit_name
-    )
+    same_type_count = count_same_type(unit, team)
 
     if same_type_count > 0:
         # Calculate bonus based on base attack damage
-        unit_attacks = getattr(unit, "attacks", []) or []
+        unit_attacks = unit.attacks
         for attack in unit_attacks:
-            if attack.attack_type == "melee":
+            if attack.attack_type is AttackKind.MELEE:
                 bonuses["melee"] = int(attack.damage * 0.5 * same_type_count)
-            elif attack.attack_type == "ranged":
+            elif attack.attack_type is AttackKind.RANGED:
                 bonuses["ranged"] = int(attack.damage * 0.5 * same_type_count)
 
     return bonuses
@@ -371,6 +368,45 @@ def calculate_pack_hunter_bonus(
 # === COMBINED STAT CALCULATIONS ===
 
 
+def calculate_team_defense_bonuses(
+    unit: Union[Creature, Player],
+    encounter: Encounter,
+    is_player_side: bool,
+) -> tuple[int, int, int]:
+    """Calculate Guardian, Protector and Shield Wall bonuses in a single pass.
+
+    Equivalent to combining calculate_guardian_bonus, calculate_protector_bonus
+    and calculate_shield_wall_bonus, but walks the unit's neighbours only once.
+
+    Returns (defense, dodge, resistance) bonus values.
+    """
+    team = encounter.player_team if is_player_side else encounter.enemy_team
+    view = get_team_view(team)
+    defense = dodge = resistance = 0
+
+    # Guardian/Protector from adjacent allies (deduplicate 2x2 units by id)
+    processed = set()
+    adjacent_indices = ()
+    if view.team_flags & (GUARDIAN | PROTECTOR):
+        adjacent_indices = get_adjacent_indices(unit, team)
+    for adj_idx in adjacent_indices:
+        flags = view.ability_flags[adj_idx]
+        if not flags & (GUARDIAN | PROTECTOR) or view.unit_ids[adj_idx] in processed:
+            continue
+        processed.add(view.unit_ids[adj_idx])
+        if flags & GUARDIAN:
+            defense += int(view.defense[adj_idx] * 0.5)
+            dodge += int(view.dodge[adj_idx] * 0.5)
+        if flags & PROTECTOR:
+            resistance += int(view.resistance[adj_idx] * 0.5)
+
+    shield_wall_bonus = calculate_shield_wall_bonus(unit, encounter, is_player_side)
+    defense += shield_wall_bonus["defense"]
+    dodge += shield_wall_bonus["dodge"]
+
+    return defense, dodge, resistance
+
+
 def get_effective_defense(
     unit: Union[Creature, Player],
     defense_type: str,
@@ -387,35 +423,25 @@ def get_effective_defense(
     - Protector bonus (resistance)
     - Shield Wall bonus (defense, dodge)
     """
-    # Base defense
-    if isinstance(unit, Player):
-        if defense_type == "defense":
-            base = unit.base_defense
-        elif defense_type == "dodge":
-            base = unit.base_dodge
-        else:
-            base = unit.base_resistance
-    else:
-        base = getattr(unit, defense_type, 0)
+    # Base defense (a hero's defense/dodge/resistance alias its base stats)
+    base = getattr(unit, defense_type)
 
     # WIS bonus from hero (only for non-player allies)
     wis_bonus = 0
     if player is not None and unit is not player:
         wis_bonus = player.wisdom // 4
 
-    # Guardian/Protector bonuses
-    guardian_bonus = calculate_guardian_bonus(unit, encounter, is_player_side)
-    protector_bonus = calculate_protector_bonus(unit, encounter, is_player_side)
-
-    # Shield Wall bonus
-    shield_wall_bonus = calculate_shield_wall_bonus(unit, encounter, is_player_side)
+    # Guardian/Protector/Shield Wall bonuses
+    defense_bonus, dodge_bonus, resistance_bonus = calculate_team_defense_bonuses(
+        unit, encounter, is_player_side
+    )
 
     if defense_type == "defense":
-        return base + wis_bonus + guardian_bonus["defense"] + shield_wall_bonus["defense"]
+        return base + wis_bonus + defense_bonus
     elif defense_type == "dodge":
-        return base + wis_bonus + guardian_bonus["dodge"] + shield_wall_bonus["dodge"]
+        return base + wis_bonus + dodge_bonus
     else:  # resistance
-        return base + wis_bonus + protector_bonus
+        return base + wis_bonus + resistance_bonus
 
 
 def get_effective_attack_damage(
@@ -433,12 +459,12 @@ def get_effective_attack_damage(
     """
     base_damage = attack.damage
 
+    # Magic doesn't benefit from Pack Hunter
+    if attack.attack_type is AttackKind.MAGIC or not unit.ability_flags & PACK_HUNTER:
+        return base_damage
+
     # Pack Hunter bonus
     pack_hunter_bonus = calculate_pack_hunter_bonus(unit, encounter, is_player_side)
-
-    if attack.attack_type == "melee":
+    if attack.attack_type is AttackKind.MELEE:
         return base_damage + pack_hunter_bonus["melee"]
-    elif attack.attack_type == "ranged":
-        return base_damage + pack_hunter_bonus["ranged"]
-    else:
-        return base_damage  # Magic doesn't benefit from Pack Hunter
+    return base_damage + pack_hunter_bonus["ranged"]
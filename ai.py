@@ -1,11 +1,15 @@
 """Enemy AI implementation based on GAME_MECHANICS.md."""
 
+import itertools
 import random
 from typing import Optional, Union
 
-from game_data import Attack, Creature, Encounter, GameState, Player
+from game_data import DRAGON_KING_ID, Attack, AttackKind, Creature, Encounter, GameState, Player
 from combat import (
-    calculate_damage,
+    INDEX_TO_COORDS,
+    apply_defense,
+    get_debuff_reduction,
+    get_defense_against,
     get_melee_target,
     get_ranged_targets,
     get_magic_targets,
@@ -14,23 +18,65 @@ from combat import (
 from abilities import (
     check_flying,
     get_effective_attack_damage,
+    get_team_view,
     has_piercing,
     has_splash,
 )
 
 
-def calculate_potential_damage(
-    encounter: Encounter,
-    target_col: int,
-    target_row: int,
-) -> int:
-    """Calculate total damage enemy team would deal to a target square.
+# Every ordering of the four orthogonal directions, for random movement
+DIRECTION_PERMS: tuple[tuple[tuple[int, int], ...], ...] = tuple(
+    itertools.permutations([(0, -1), (0, 1), (-1, 0), (1, 0)])
+)
 
-    Each unit uses best attack. 2x2 units count once.
+
+__all__ = [
+    "build_attack_plan",
+    "calculate_potential_damage",
+    "choose_enemy_target",
+    "clear_damage_cache",
+    "execute_enemy_turn",
+    "get_damage_grid",
+    "get_enemy_action_description",
+    "get_enemy_attack_targets",
+    "handle_dragon_king_movement",
+    "try_enemy_movement",
+]
+
+
+def clear_damage_cache(encounter: Encounter) -> None:
+    """Invalidate the encounter's cached enemy damage grid.
+
+    Call after anything that changes either team: placement, movement,
+    attacks, conversions, or direct edits to a unit's stats or attacks.
+    """
+    encounter.damage_grid = None
+
+
+def get_damage_grid(encounter: Encounter) -> list[int]:
+    """Get the potential enemy damage for all 9 target squares (index = row * 3 + col).
+
+    The grid is stored on the encounter and reused until clear_damage_cache is called.
+    """
+    grid = encounter.damage_grid
+    if grid is None:
+        plan = build_attack_plan(encounter)
+        grid = [calculate_potential_damage(encounter, col, row, plan) for col, row in INDEX_TO_COORDS]
+        encounter.damage_grid = grid
+    return grid
+
+
+def build_attack_plan(encounter: Encounter) -> list[tuple]:
+    """Resolve everything about the enemy team's attacks that does not depend on the target square.
+
+    Returns one (unit, attack_entries) tuple per unique enemy unit, where each
+    attack entry is (attack, attacker_col, rows_to_try, net_damage, fixed_targets).
+    net_damage is the attack's damage after bonuses and the attacker's debuffs. fixed_targets is the precomputed target list for magic attacks
+    (which ignore the target square) and None otherwise.
     """
     from gameplay import get_2x2_primary_position
 
-    total_damage = 0
+    plan = []
     processed_units = set()
 
     for idx, unit in enumerate(encounter.enemy_team or []):
@@ -43,7 +89,7 @@ def calculate_potential_damage(
         processed_units.add(id(unit))
 
         # For 2x2 units, use primary position
-        if getattr(unit, "size", "1x1") == "2x2":
+        if unit.size == "2x2":
             primary_pos = get_2x2_primary_position(encounter.enemy_team, unit)
             if primary_pos:
                 attacker_col, attacker_row = primary_pos
@@ -52,42 +98,74 @@ def calculate_potential_damage(
         else:
             attacker_col, attacker_row = grid_index_to_coords(idx)
 
-        attacks = getattr(unit, "attacks", []) or []
-        is_2x2 = getattr(unit, "size", "1x1") == "2x2"
+        attacks = unit.attacks
+        is_2x2 = unit.size == "2x2"
+        attacker_debuffs = unit.debuffs
 
-        # Select best attack that can hit the target
-        best_damage = 0
+        attack_entries = []
         for attack in attacks:
             # For 2x2 units with melee, try both rows they occupy
             rows_to_try = [attacker_row]
-            if is_2x2 and attack.attack_type == "melee" and attacker_row < 2:
+            if is_2x2 and attack.attack_type is AttackKind.MELEE and attacker_row < 2:
                 rows_to_try.append(attacker_row + 1)
 
-            for try_row in rows_to_try:
-                targets = get_enemy_attack_targets(
-                    encounter, attack, attacker_col, try_row, target_col, target_row
-                )
+            # Effective damage (bonuses and debuffs applied) does not depend on the target
+            effective_damage = get_effective_attack_damage(
+                unit, attack, encounter, is_player_side=False
+            )
+            debuff_reduction = get_debuff_reduction(attack.attack_type, attacker_debuffs)
+            net_damage = max(0, effective_damage - debuff_reduction)
 
-                for target, _, _ in targets:
-                    # Get effective damage
-                    effective_damage = get_effective_attack_damage(
-                        unit, attack, encounter, is_player_side=False
-                    )
-                    modified_attack = Attack(
-                        attack_type=attack.attack_type,
-                        damage=effective_damage,
-                        range_min=attack.range_min,
-                        range_max=attack.range_max,
-                        abilities=attack.abilities,
-                    )
+            fixed_targets = None
+            if attack.attack_type is AttackKind.MAGIC:
+                fixed_targets = get_magic_targets(encounter, attacker_col, False)
 
-                    # Calculate damage considering target's Flying
-                    defender_has_flying = check_flying(target)
-                    attacker_debuffs = getattr(unit, "debuffs", {}) or {}
+            attack_entries.append(
+                (attack, attacker_col, rows_to_try, net_damage, fixed_targets)
+            )
 
-                    damage = calculate_damage(
-                        modified_attack, unit, target, attacker_debuffs, defender_has_flying
+        plan.append((unit, attack_entries))
+
+    return plan
+
+
+def calculate_potential_damage(
+    encounter: Encounter,
+    target_col: int,
+    target_row: int,
+    plan: Optional[list[tuple]] = None,
+) -> int:
+    """Calculate total damage enemy team would deal to a target square.
+
+    Each unit uses best attack. 2x2 units count once.
+    Pass a plan from build_attack_plan to reuse it across target squares.
+    """
+    if plan is None:
+        plan = build_attack_plan(encounter)
+
+    total_damage = 0
+
+    for unit, attack_entries in plan:
+        # Select best attack that can hit the target
+        best_damage = 0
+        for attack, attacker_col, rows_to_try, net_damage, fixed_targets in attack_entries:
+            if net_damage <= 0:
+                continue  # Cannot deal damage to anyone
+            is_melee = attack.attack_type is AttackKind.MELEE
+
+            for try_row in rows_to_try:
+                if fixed_targets is not None:
+                    targets = fixed_targets
+                else:
+                    targets = get_enemy_attack_targets(
+                        encounter, attack, attacker_col, try_row, target_col, target_row
                     )
+
+                for target, _, _ in targets:
+                    # Flying is immune to melee
+                    if is_melee and check_flying(target):
+                        continue
+                    damage = apply_defense(net_damage, get_defense_against(target, attack.attack_type))
                     if damage > best_damage:
                         best_damage = damage
 
@@ -107,7 +185,7 @@ def get_enemy_attack_targets(
     """Get all valid targets for an enemy attack against player team."""
     targets = []
 
-    if attack.attack_type == "melee":
+    if attack.attack_type is AttackKind.MELEE:
         # Enemy attacks player side (attacker_is_player=False)
         target = get_melee_target(
             encounter, attacker_col, attacker_row, False, target_col, target_row
@@ -125,7 +203,7 @@ def get_enemy_attack_targets(
             else:
                 targets.append((target, target_col, target_row))
 
-    elif attack.attack_type == "ranged":
+    elif attack.attack_type is AttackKind.RANGED:
         range_min = attack.range_min or 1
         range_max = attack.range_max or 3
         targets = get_ranged_targets(
@@ -140,7 +218,7 @@ def get_enemy_attack_targets(
             has_splash(attack),
         )
 
-    elif attack.attack_type == "magic":
+    elif attack.attack_type is AttackKind.MAGIC:
         targets = get_magic_targets(encounter, attacker_col, False)
 
     return targets
@@ -153,19 +231,12 @@ def choose_enemy_target(encounter: Encounter) -> tuple[tuple[int, int], int]:
     Considers empty squares for Splash attacks.
     Returns ((col, row), damage) of target square and expected damage.
     """
-    best_target = (1, 1)  # Default to center
-    best_damage = -1
+    # Consider all squares (including empty for Splash); ties go to the first square
+    damages = get_damage_grid(encounter)
+    best_idx = max(range(9), key=damages.__getitem__)
+    best_row, best_col = divmod(best_idx, 3)
 
-    for row in range(3):
-        for col in range(3):
-            # Consider all squares (including empty for Splash)
-            damage = calculate_potential_damage(encounter, col, row)
-
-            if damage > best_damage:
-                best_damage = damage
-                best_target = (col, row)
-
-    return best_target, max(0, best_damage)
+    return (best_col, best_row), max(0, damages[best_idx])
 
 
 def execute_enemy_turn(gamestate: GameState) -> list[dict]:
@@ -217,28 +288,28 @@ def handle_dragon_king_movement(encounter: Encounter) -> None:
     """Dragon King moves 1 square in a random direction after attacking."""
     from gameplay import move_2x2_unit, get_2x2_primary_position, add_combat_log
 
+    if DRAGON_KING_ID not in get_team_view(encounter.enemy_team).name_id_counts:
+        return
+
     processed = set()
     for unit in encounter.enemy_team or []:
         if unit is None or id(unit) in processed:
             continue
         processed.add(id(unit))
 
-        if getattr(unit, "name", "") == "Dragon King":
+        if unit.name_id == DRAGON_KING_ID:
             # Get current position before move attempt
             old_pos = get_2x2_primary_position(encounter.enemy_team, unit)
 
-            # Random orthogonal direction
-            directions = [(0, -1), (0, 1), (-1, 0), (1, 0)]
-            random.shuffle(directions)
-
-            # Try each direction until one works
-            for direction in directions:
+            # Try each orthogonal direction in random order until one works
+            for direction in DIRECTION_PERMS[random.randrange(len(DIRECTION_PERMS))]:
                 move_2x2_unit(encounter.enemy_team, unit, direction)
-                # Check if position actually changed
+                # Check if position actually changed (a failed move leaves it in place)
                 new_pos = get_2x2_primary_position(encounter.enemy_team, unit)
                 if new_pos != old_pos:
                     add_combat_log(encounter, "Dragon King shifts position")
                     break  # Move succeeded
+            clear_damage_cache(encounter)
 
             break  # Only one Dragon King
 
@@ -262,11 +333,11 @@ def try_enemy_movement(encounter: Encounter) -> bool:
         processed.add(id(unit))
 
         # Skip 2x2 units for now (they have special movement)
-        if getattr(unit, "size", "1x1") == "2x2":
+        if unit.size == "2x2":
             continue
 
         # Determine unit's primary attack type
-        attacks = getattr(unit, "attacks", []) or []
+        attacks = unit.attacks
         attack_types = [a.attack_type for a in attacks]
 
         units_with_positions.append((idx, unit, attack_types))
@@ -276,7 +347,7 @@ def try_enemy_movement(encounter: Encounter) -> bool:
 
     for idx, unit, attack_types in units_with_positions:
         # Determine movement direction based on attack type
-        if "melee" in attack_types:
+        if AttackKind.MELEE in attack_types:
             # Melee units move vertically (up or down)
             directions = [(0, -1), (0, 1)]
         else:
@@ -294,15 +365,10 @@ def try_enemy_movement(encounter: Encounter) -> bool:
 
 def get_enemy_action_description(encounter: Encounter) -> str:
     """Get a description of what the enemy is about to do (for UI)."""
+    # Served from the cached damage grid once the turn's grid has been computed
     (target_col, target_row), damage = choose_enemy_target(encounter)
 
-    # Count attacking units
-    attacking_units = 0
-    for unit in encounter.enemy_team or []:
-        if unit is not None:
-            attacking_units += 1
-
     # Unique units only (for 2x2)
-    unique_units = len(set(id(u) for u in (encounter.enemy_team or []) if u is not None))
+    unique_units = len(get_team_view(encounter.enemy_team).slots_by_id)
 
     return f"Enemy attacks ({unique_units} units targeting position ({target_col}, {target_row}), ~{damage} damage)"
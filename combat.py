@@ -1,9 +1,10 @@
 """Core combat system implementation based on GAME_MECHANICS.md."""
 
-import math
+from dataclasses import dataclass
+from functools import lru_cache
 from typing import Optional, Union
 
-from game_data import Attack, Creature, Encounter, Player
+from game_data import HASTE, Attack, AttackKind, Creature, Encounter, Player
 
 
 # Grid layout constants
@@ -12,6 +13,39 @@ from game_data import Attack, Creature, Encounter, Player
 # Global column distance used for range calculations
 
 
+def _build_splash_squares() -> tuple[tuple[int, ...], ...]:
+    """For each grid index, the index itself followed by its in-bounds orthogonal neighbours."""
+    squares = []
+    for idx in range(9):
+        col, row = idx % 3, idx // 3
+        hit = [idx]
+        for dx, dy in [(0, -1), (0, 1), (-1, 0), (1, 0)]:
+            adj_col = col + dx
+            adj_row = row + dy
+            if 0 <= adj_col < 3 and 0 <= adj_row < 3:
+                hit.append(adj_row * 3 + adj_col)
+        squares.append(tuple(hit))
+    return tuple(squares)
+
+
+# Squares hit by a Splash attack aimed at each grid index
+SPLASH_SQUARES = _build_splash_squares()
+
+# Ally grid indices that block a melee attacker at each index, keyed by attacker_is_player.
+# Player front is column 2 (allies at higher columns block); enemy front is column 0.
+MELEE_BLOCKERS: dict[bool, tuple[tuple[int, ...], ...]] = {
+    True: tuple(tuple(idx - idx % 3 + col for col in range(idx % 3 + 1, 3)) for idx in range(9)),
+    False: tuple(tuple(idx - idx % 3 + col for col in range(idx % 3)) for idx in range(9)),
+}
+
+# Opposing grid indices in each row, closest first, keyed by attacker_is_player.
+# The enemy's front is its column 0; the player's front is column 2.
+MELEE_FRONT_TO_BACK: dict[bool, tuple[tuple[int, ...], ...]] = {
+    True: tuple((row * 3, row * 3 + 1, row * 3 + 2) for row in range(3)),
+    False: tuple((row * 3 + 2, row * 3 + 1, row * 3) for row in range(3)),
+}
+
+
 def get_global_column(is_player_side: bool, local_col: int) -> int:
     """Convert local column (0-2) to global column (0-5).
 
@@ -29,9 +63,27 @@ def calculate_column_distance(attacker_global_col: int, target_global_col: int)
     return abs(attacker_global_col - target_global_col)
 
 
+# Column distance from attacker local column to target local column on the
+# opposing grid, keyed by attacker_is_player: RANGED_DISTANCE[side][attacker_col][target_col]
+RANGED_DISTANCE: dict[bool, tuple[tuple[int, ...], ...]] = {
+    side: tuple(
+        tuple(
+            calculate_column_distance(get_global_column(side, attacker_col), get_global_column(not side, target_col))
+            for target_col in range(3)
+        )
+        for attacker_col in range(3)
+    )
+    for side in (True, False)
+}
+
+
+# (col, row) for each grid index 0-8
+INDEX_TO_COORDS: tuple[tuple[int, int], ...] = tuple((idx % 3, idx // 3) for idx in range(9))
+
+
 def grid_index_to_coords(index: int) -> tuple[int, int]:
     """Convert 1D index (0-8) to (col, row) coordinates."""
-    return index % 3, index // 3
+    return INDEX_TO_COORDS[index]
 
 
 def coords_to_grid_index(col: int, row: int) -> int:
@@ -65,45 +117,16 @@ def get_melee_target(
         return None
 
     # Check if an ally is blocking (in front of the attacker)
-    # For player: front is column 2, so check columns > attacker_col
-    # For enemy: front is column 0, so check columns < attacker_col
-    for col in range(3):
-        if attacker_is_player:
-            # Player front is column 2; allies in columns > attacker block
-            if col > attacker_col:
-                idx = attacker_row * 3 + col
-                if ally_team[idx] is not None:
-                    return None  # Blocked by ally
-        else:
-            # Enemy front is column 0; allies in columns < attacker block
-            if col < attacker_col:
-                idx = attacker_row * 3 + col
-                if ally_team[idx] is not None:
-                    return None  # Blocked by ally
+    for idx in MELEE_BLOCKERS[attacker_is_player][attacker_row * 3 + attacker_col]:
+        if ally_team[idx] is not None:
+            return None  # Blocked by ally
 
     # Find the closest enemy in the attacker's row
-    closest_enemy = None
-    closest_col = None
-
-    for col in range(3):
-        idx = attacker_row * 3 + col
+    for idx in MELEE_FRONT_TO_BACK[attacker_is_player][attacker_row]:
         enemy = enemy_team[idx]
         if enemy is not None:
-            if attacker_is_player:
-                # For player, lower column = front = closer to enemy
-                # Enemy front column (0 for them) is closest to player
-                if closest_enemy is None or col < closest_col:
-                    closest_enemy = enemy
-                    closest_col = col
-            else:
-                # For enemy attacking player, higher column = front = closer
-                if closest_enemy is None or col > closest_col:
-                    closest_enemy = enemy
-                    closest_col = col
-
-    # Check if selected target matches closest
-    if closest_enemy is not None and target_col == closest_col:
-        return closest_enemy
+            # Check if selected target matches closest
+            return enemy if target_col == idx % 3 else None
 
     return None
 
@@ -127,34 +150,28 @@ def get_ranged_targets(
     """
     enemy_team = encounter.enemy_team if attacker_is_player else encounter.player_team
 
-    attacker_global = get_global_column(attacker_is_player, attacker_col)
-    target_global = get_global_column(not attacker_is_player, target_col)
-
-    distance = calculate_column_distance(attacker_global, target_global)
+    distance = RANGED_DISTANCE[attacker_is_player][attacker_col][target_col]
 
     if not (range_min <= distance <= range_max):
         return []  # Out of range
 
-    targets = []
-    squares_to_check = [(target_col, target_row)]
+    target_idx = target_row * 3 + target_col
 
-    if has_splash:
-        # Add orthogonally adjacent squares
-        for dx, dy in [(0, -1), (0, 1), (-1, 0), (1, 0)]:
-            adj_col = target_col + dx
-            adj_row = target_row + dy
-            if 0 <= adj_col < 3 and 0 <= adj_row < 3:
-                squares_to_check.append((adj_col, adj_row))
+    if not has_splash:
+        creature = enemy_team[target_idx]
+        return [(creature, target_col, target_row)] if creature is not None else []
 
-    # Track 2x2 units to avoid double-hitting
-    processed_units = set()
+    # Target square plus its orthogonally adjacent squares
+    targets = []
 
-    for col, row in squares_to_check:
-        idx = row * 3 + col
+    for idx in SPLASH_SQUARES[target_idx]:
         creature = enemy_team[idx]
-        if creature is not None and id(creature) not in processed_units:
-            targets.append((creature, col, row))
-            processed_units.add(id(creature))
+        if creature is None:
+            continue
+        # A 2x2 unit may fill several splash squares; at most five entries to scan
+        if any(hit is creature for hit, _, _ in targets):
+            continue
+        targets.append((creature, *INDEX_TO_COORDS[idx]))
 
     return targets
 
@@ -179,19 +196,43 @@ def get_magic_targets(
     # Mirror column: player col 0 (back) hits enemy col 2 (back), etc.
     mirror_col = 2 - attacker_col
 
+    top, middle, bottom = enemy_team[mirror_col::3]
     targets = []
-    processed_units = set()
 
-    for row in range(3):
-        idx = row * 3 + mirror_col
-        creature = enemy_team[idx]
-        if creature is not None and id(creature) not in processed_units:
-            targets.append((creature, mirror_col, row))
-            processed_units.add(id(creature))
+    # A 2x2 unit fills two adjacent rows of a column, so comparing against the
+    # previous row's occupant is enough to avoid double-hitting it
+    if top is not None:
+        targets.append((top, mirror_col, 0))
+    if middle is not None and middle is not top:
+        targets.append((middle, mirror_col, 1))
+    if bottom is not None and bottom is not middle:
+        targets.append((bottom, mirror_col, 2))
 
     return targets
 
 
+def _has_ranged_target(
+    encounter: Encounter,
+    attacker_col: int,
+    attacker_is_player: bool,
+    target_col: int,
+    target_row: int,
+    range_min: int,
+    range_max: int,
+) -> bool:
+    """Whether a non-splash ranged attack at the target square would hit anything."""
+    if not (range_min <= RANGED_DISTANCE[attacker_is_player][attacker_col][target_col] <= range_max):
+        return False
+    enemy_team = encounter.enemy_team if attacker_is_player else encounter.player_team
+    return enemy_team[target_row * 3 + target_col] is not None
+
+
+def _has_magic_target(encounter: Encounter, attacker_col: int, attacker_is_player: bool) -> bool:
+    """Whether the mirror column holds any enemy."""
+    enemy_team = encounter.enemy_team if attacker_is_player else encounter.player_team
+    return any(unit is not None for unit in enemy_team[2 - attacker_col::3])
+
+
 def can_attack_target(
     encounter: Encounter,
     attacker: Union[Creature, Player],
@@ -202,31 +243,26 @@ def can_attack_target(
     attacker_is_player: bool,
 ) -> bool:
     """Check if an attacker can hit a target with the given attack."""
-    attacker_col, attacker_row = grid_index_to_coords(attacker_idx)
+    attacker_col, attacker_row = INDEX_TO_COORDS[attacker_idx]
 
-    if attack.attack_type == "melee":
+    if attack.attack_type is AttackKind.MELEE:
         target = get_melee_target(
             encounter, attacker_col, attacker_row, attacker_is_player, target_col, target_row
         )
         return target is not None
-    elif attack.attack_type == "ranged":
-        range_min = attack.range_min or 1
-        range_max = attack.range_max or 3
-        targets = get_ranged_targets(
+    elif attack.attack_type is AttackKind.RANGED:
+        return _has_ranged_target(
             encounter,
             attacker_col,
-            attacker_row,
             attacker_is_player,
             target_col,
             target_row,
-            range_min,
-            range_max,
+            attack.range_min or 1,
+            attack.range_max or 3,
         )
-        return len(targets) > 0
-    elif attack.attack_type == "magic":
-        targets = get_magic_targets(encounter, attacker_col, attacker_is_player)
+    elif attack.attack_type is AttackKind.MAGIC:
         # Magic hits if any target exists in the mirror column
-        return len(targets) > 0
+        return _has_magic_target(encounter, attacker_col, attacker_is_player)
 
     return False
 
@@ -234,61 +270,131 @@ def can_attack_target(
 # === DAMAGE CALCULATION ===
 
 
+@dataclass(frozen=True)
+class AttackMeta:
+    """Combat rules that depend only on the attack type."""
+
+    debuffs: tuple[tuple[str, int], ...]  # (debuff, damage reduction per stack) pairs
+    defense_attr: str  # Defender stat that reduces this attack
+    flying_immune: bool  # Flying defenders take no damage from it
+
+
+# Indexed by AttackKind
+ATTACK_META: tuple[AttackMeta, ...] = (
+    AttackMeta((("defanged", 6), ("weakened", 3)), "defense", True),  # MELEE
+    AttackMeta((("blinded", 6), ("weakened", 3)), "dodge", False),  # RANGED
+    AttackMeta((("silenced", 6), ("weakened", 3)), "resistance", False),  # MAGIC
+)
+
+
+def get_debuff_reduction(attack_type: AttackKind, attacker_debuffs: dict[str, int]) -> int:
+    """Get how much an attacker's debuffs reduce damage of the given attack type."""
+    if not attacker_debuffs:  # Most units carry no debuffs
+        return 0
+    (debuff, per_stack), (shared_debuff, shared_per_stack) = ATTACK_META[attack_type].debuffs
+    return (
+        attacker_debuffs.get(debuff, 0) * per_stack
+        + attacker_debuffs.get(shared_debuff, 0) * shared_per_stack
+    )
+
+
+def get_defense_against(defender: Union[Creature, Player], attack_type: AttackKind) -> int:
+    """Get the defender's base defense stat relevant to an attack type."""
+    return getattr(defender, ATTACK_META[attack_type].defense_attr)
+
+
+def apply_defense(net_damage: int, defense: int) -> int:
+    """Final damage from debuff-reduced attack damage: max(1, damage - defense), or 0."""
+    return max(1, net_damage - defense) if net_damage > 0 else 0
+
+
 def calculate_damage(
     attack: Attack,
     attacker: Union[Creature, Player],
     defender: Union[Creature, Player],
     attacker_debuffs: Optional[dict[str, int]] = None,
     defender_has_flying: bool = False,
+    damage_override: Optional[int] = None,
 ) -> int:
     """Calculate final damage: max(1, attack_damage - relevant_defense).
 
     Applies debuff reductions to attack damage.
     Returns 0 if defender has Flying and attack is melee.
+    If damage_override is given it replaces attack.damage (e.g. with bonuses applied).
     """
-    if attacker_debuffs is None:
-        attacker_debuffs = {}
+    base_damage = attack.damage if damage_override is None else damage_override
 
-    base_damage = attack.damage
+    meta = ATTACK_META[attack.attack_type]
 
     # Flying immunity to melee
-    if attack.attack_type == "melee" and defender_has_flying:
+    if meta.flying_immune and defender_has_flying:
         return 0
 
     # Apply debuffs to attack damage
-    debuff_reduction = 0
-    if attack.attack_type == "melee":
-        debuff_reduction = attacker_debuffs.get("defanged", 0) * 6
-        debuff_reduction += attacker_debuffs.get("weakened", 0) * 3
-    elif attack.attack_type == "ranged":
-        debuff_reduction = attacker_debuffs.get("blinded", 0) * 6
-        debuff_reduction += attacker_debuffs.get("weakened", 0) * 3
-    elif attack.attack_type == "magic":
-        debuff_reduction = attacker_debuffs.get("silenced", 0) * 6
-        debuff_reduction += attacker_debuffs.get("weakened", 0) * 3
-
-    effective_damage = max(0, base_damage - debuff_reduction)
+    effective_damage = base_damage
+    if attacker_debuffs:
+        effective_damage = max(0, base_damage - get_debuff_reduction(attack.attack_type, attacker_debuffs))
 
     # Get relevant defense
-    if attack.attack_type == "melee":
-        defense = getattr(defender, "defense", 0)
-        if isinstance(defender, Player):
-            defense = defender.base_defense
-    elif attack.attack_type == "ranged":
-        defense = getattr(defender, "dodge", 0)
-        if isinstance(defender, Player):
-            defense = defender.base_dodge
-    else:  # magic
-        defense = getattr(defender, "resistance", 0)
-        if isinstance(defender, Player):
-            defense = defender.base_resistance
-
-    return max(1, effective_damage - defense) if effective_damage > 0 else 0
+    defense = getattr(defender, meta.defense_attr)
+
+    return apply_defense(effective_damage, defense)
+
+
+def calculate_conversion_points(
+    base_value: int,
+    effective_efficacy: int,
+    target_below_half_hp: bool,
+    highest_defense: int,
+) -> int:
+    """Conversion points from debuff-reduced attack strength, in integer arithmetic.
+
+    points = floor(base * efficacy / 100), then +50% (floored) if the target is
+    below half HP, minus the target's highest defense stat (minimum 0).
+    """
+    points = base_value * effective_efficacy // 100
+    if target_below_half_hp:
+        points = points * 3 // 2
+    return max(0, points - highest_defense)
 
 
 # === HERO STAT CALCULATIONS ===
 
 
+@lru_cache(maxsize=256)
+def _hero_stat_bonuses(battle: int, intelligence: int, wisdom: int, charisma: int) -> tuple[int, ...]:
+    """Attribute-derived hero bonuses, memoized on the attributes that drive them.
+
+    Returns (melee_attack, ranged_attack, magic_attack, defense, dodge, resistance) bonuses.
+    """
+    # battle_scale = 0.25 + 0.05 * battle == (5 + battle) / 20, kept in integers
+    scale_num = 5 + battle
+
+    # INT affects ranged
+    int_effective = intelligence * scale_num // 20
+    ranged_attack_bonus = int_effective // 2
+    dodge_bonus = int_effective // 3
+
+    # WIS affects melee
+    wis_effective = wisdom * scale_num // 20
+    melee_attack_bonus = wis_effective // 2
+    defense_bonus = wis_effective // 3
+
+    # CHA affects magic
+    cha_effective = charisma * scale_num // 20
+    magic_attack_bonus = cha_effective // 2
+    resistance_bonus = cha_effective // 3
+
+    return (
+        melee_attack_bonus,
+        ranged_attack_bonus,
+        magic_attack_bonus,
+        defense_bonus,
+        dodge_bonus,
+        resistance_bonus,
+    )
+
+
 def calculate_hero_combat_stats(player: Player) -> dict:
     """Calculate hero's effective combat stats based on attributes.
 
@@ -301,30 +407,17 @@ def calculate_hero_combat_stats(player: Player) -> dict:
     WIS affects melee attack/defense
     CHA affects magic attack/resistance
     """
-    battle_scale = 0.25 + 0.05 * player.battle
-
-    # INT affects ranged
-    int_effective = math.floor(player.intelligence * battle_scale)
-    ranged_attack_bonus = math.floor(int_effective / 2)
-    dodge_bonus = math.floor(int_effective / 3)
-
-    # WIS affects melee
-    wis_effective = math.floor(player.wisdom * battle_scale)
-    melee_attack_bonus = math.floor(wis_effective / 2)
-    defense_bonus = math.floor(wis_effective / 3)
-
-    # CHA affects magic
-    cha_effective = math.floor(player.charisma * battle_scale)
-    magic_attack_bonus = math.floor(cha_effective / 2)
-    resistance_bonus = math.floor(cha_effective / 3)
+    melee, ranged, magic, defense, dodge, resistance = _hero_stat_bonuses(
+        player.battle, player.intelligence, player.wisdom, player.charisma
+    )
 
     return {
-        "melee_attack": player.base_melee_attack + melee_attack_bonus,
-        "ranged_attack": player.base_ranged_attack + ranged_attack_bonus,
-        "magic_attack": player.base_magic_attack + magic_attack_bonus,
-        "defense": player.base_defense + defense_bonus,
-        "dodge": player.base_dodge + dodge_bonus,
-        "resistance": player.base_resistance + resistance_bonus,
+        "melee_attack": player.base_melee_attack + melee,
+        "ranged_attack": player.base_ranged_attack + ranged,
+        "magic_attack": player.base_magic_attack + magic,
+        "defense": player.base_defense + defense,
+        "dodge": player.base_dodge + dodge,
+        "resistance": player.base_resistance + resistance,
     }
 
 
@@ -341,23 +434,32 @@ def calculate_ally_buffs(player: Player) -> dict:
     }
 
 
+@lru_cache(maxsize=256)
+def _efficacy_with_cha(charisma: int, base_efficacy: int) -> int:
+    """Memoized CHA efficacy scaling (see calculate_effective_efficacy)."""
+    return base_efficacy * (10 + charisma // 4) // 10
+
+
 def calculate_effective_efficacy(player: Player, base_efficacy: int) -> int:
     """Calculate effective conversion efficacy with CHA bonus.
 
     +10% per +4 CHA (multiplicative).
     """
-    cha_bonus_multiplier = 1 + 0.10 * (player.charisma // 4)
-    return math.floor(base_efficacy * cha_bonus_multiplier)
+    return _efficacy_with_cha(player.charisma, base_efficacy)
 
 
 def get_hero_attacks(player: Player) -> list[Attack]:
-    """Get the hero's available attacks with calculated damage values."""
+    """Get the hero's available attacks with calculated damage values.
+
+    The damage values come from the memoized stat bonuses; the attacks
+    themselves are built fresh so callers may modify them.
+    """
     hero_stats = calculate_hero_combat_stats(player)
 
     return [
-        Attack(attack_type="melee", damage=hero_stats["melee_attack"]),
-        Attack(attack_type="ranged", damage=hero_stats["ranged_attack"], range_min=2, range_max=3),
-        Attack(attack_type="magic", damage=hero_stats["magic_attack"]),
+        Attack(attack_type=AttackKind.MELEE, damage=hero_stats["melee_attack"]),
+        Attack(attack_type=AttackKind.RANGED, damage=hero_stats["ranged_attack"], range_min=2, range_max=3),
+        Attack(attack_type=AttackKind.MAGIC, damage=hero_stats["magic_attack"]),
     ]
 
 
@@ -370,31 +472,32 @@ def get_creature_effective_defense(
     defense_type: str,
 ) -> int:
     """Get creature's effective defense including ally buffs from hero WIS."""
-    base_defense = getattr(creature, defense_type, 0)
+    base_defense = getattr(creature, defense_type)
     ally_buffs = calculate_ally_buffs(player)
     return base_defense + ally_buffs.get(defense_type, 0)
 
 
 def has_ability(unit: Union[Creature, Player], ability_name: str) -> bool:
-    """Check if a unit has a specific ability (exact or prefix match)."""
-    abilities = getattr(unit, "abilities", []) or []
-    for ability in abilities:
-        if ability == ability_name or ability.startswith(ability_name + " "):
-            return True
-    return False
+    """Check if a unit has a specific ability (exact or whole-word prefix match)."""
+    return ability_name in unit.ability_index
 
 
 def get_ability_value(unit: Union[Creature, Player], ability_prefix: str) -> Optional[int]:
-    """Get the numeric value from an ability like 'Evasion 50%' or 'Healing 3'."""
-    abilities = getattr(unit, "abilities", []) or []
-    for ability in abilities:
+    """Get the numeric value from an ability like 'Evasion 50%' or 'Healing 3'.
+
+    Whole-word names are answered from the ability index; any other prefix
+    (e.g. 'Evas') falls back to scanning the abilities.
+    """
+    value = unit.ability_index.get(ability_prefix)
+    if value is not None:
+        return value
+    for ability in unit.abilities:
         if ability.startswith(ability_prefix):
             # Parse "Evasion 50%" or "Healing 3"
             parts = ability.split()
             if len(parts) >= 2:
-                value_str = parts[1].rstrip("%")
                 try:
-                    return int(value_str)
+                    return int(parts[1].rstrip("%"))
                 except ValueError:
                     pass
     return None
@@ -403,6 +506,6 @@ def get_ability_value(unit: Union[Creature, Player], ability_prefix: str) -> Opt
 def check_haste(encounter: Encounter) -> bool:
     """Check if any enemy has Haste ability - they go first."""
     for unit in encounter.enemy_team or []:
-        if unit and has_ability(unit, "Haste"):
+        if unit and unit.ability_flags & HASTE:
             return True
     return False
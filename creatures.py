@@ -1,10 +1,11 @@
 """Creature definitions registry based on GAME_ENTITIES.md."""
 
-import copy
 import random
+from dataclasses import replace
+from types import MappingProxyType
 from typing import Optional
 
-from game_data import Attack, Creature
+from game_data import Attack, Creature, parse_attack_range
 
 
 def _create_attack(
@@ -383,50 +384,119 @@ BOSS_REGISTRY: dict[str, Creature] = {
 }
 
 
+# Creature templates and names per (biome, terrain), flattened from CREATURE_REGISTRY
+_TERRAIN_INDEX: dict[tuple[str, str], tuple[Creature, ...]] = {
+    (biome, terrain): tuple(creatures.values())
+    for biome, biome_data in CREATURE_REGISTRY.items()
+    for terrain, creatures in biome_data.items()
+}
+_TERRAIN_NAMES: dict[tuple[str, str], tuple[str, ...]] = {
+    (biome, terrain): tuple(creatures)
+    for biome, biome_data in CREATURE_REGISTRY.items()
+    for terrain, creatures in biome_data.items()
+}
+
+
+def _build_name_index() -> dict[str, Creature]:
+    """Map every creature name to its template; bosses win, then the first biome/terrain listing."""
+    index: dict[str, Creature] = {}
+    for creatures in _TERRAIN_INDEX.values():
+        for creature in creatures:
+            index.setdefault(creature.name, creature)
+    index.update(BOSS_REGISTRY)
+    return index
+
+
+_NAME_INDEX = _build_name_index()
+
+
+def _freeze_tier_bonus(bonus: dict) -> MappingProxyType:
+    """Get a read-only copy of a tier bonus, with new attack ranges ('2-3') pre-parsed."""
+    frozen = dict(bonus)
+    if "glyphs" in frozen:
+        frozen["glyphs"] = tuple(frozen["glyphs"])
+    if "abilities" in frozen:
+        frozen["abilities"] = tuple(frozen["abilities"])
+    if "attack_abilities" in frozen:
+        frozen["attack_abilities"] = MappingProxyType({
+            attack_type: tuple(abilities) for attack_type, abilities in frozen["attack_abilities"].items()
+        })
+    if "new_attack" in frozen:
+        new_attack = dict(frozen["new_attack"])
+        if "abilities" in new_attack:
+            new_attack["abilities"] = tuple(new_attack["abilities"])
+        new_attack["range_min"], new_attack["range_max"] = parse_attack_range(new_attack.get("range", ""))
+        frozen["new_attack"] = MappingProxyType(new_attack)
+    return MappingProxyType(frozen)
+
+
+def _prepare_template(template: Creature) -> None:
+    """Freeze a template's shared read-only data and pre-parse its tier bonuses.
+
+    Clones share tier_bonuses and glyphs with their template, so these become
+    tuples and read-only mappings: an in-place edit on a spawned creature
+    raises instead of leaking into every later spawn. Template ability lists
+    become tuples too; _clone_creature gives each instance its own lists.
+    """
+    if template.glyphs is not None:
+        template.glyphs = tuple(template.glyphs)
+    template.abilities = tuple(template.abilities)
+    for attack in template.attacks:
+        attack.abilities = tuple(attack.abilities)
+    template.tier_bonuses = tuple(_freeze_tier_bonus(bonus) for bonus in template.tier_bonuses)
+
+
+for _template in _NAME_INDEX.values():
+    _prepare_template(_template)
+
+
+def _clone_creature(template: Creature) -> Creature:
+    """Create a fresh creature instance from a registry template.
+
+    Only per-instance mutable state (attacks, abilities, debuffs) is copied;
+    tier_bonuses, glyphs and color are read-only and shared with the template.
+    """
+    return replace(
+        template,
+        attacks=[replace(attack, abilities=list(attack.abilities)) for attack in template.attacks],
+        abilities=list(template.abilities),
+        debuffs=dict(template.debuffs),
+    )
+
+
 def get_creature_for_terrain(biome: str, terrain: str) -> Optional[Creature]:
     """Get a random creature template for the given biome/terrain.
 
-    Returns a deep copy of the creature template, or None if no creatures exist
+    Returns a fresh copy of the creature template, or None if no creatures exist
     for the given biome/terrain combination.
     """
-    if biome in CREATURE_REGISTRY and terrain in CREATURE_REGISTRY[biome]:
-        creatures = list(CREATURE_REGISTRY[biome][terrain].values())
-        if creatures:
-            return copy.deepcopy(random.choice(creatures))
+    creatures = _TERRAIN_INDEX.get((biome, terrain))
+    if creatures:
+        return _clone_creature(random.choice(creatures))
     return None
 
 
 def get_all_creatures_for_terrain(biome: str, terrain: str) -> list[str]:
     """Get all creature names available for a biome/terrain combination."""
-    if biome in CREATURE_REGISTRY and terrain in CREATURE_REGISTRY[biome]:
-        return list(CREATURE_REGISTRY[biome][terrain].keys())
-    return []
+    return list(_TERRAIN_NAMES.get((biome, terrain), ()))
 
 
 def spawn_creature(name: str) -> Creature:
     """Create a new instance of a creature by name.
 
-    Searches all biomes for the creature and returns a deep copy.
+    Looks the creature up among bosses and every biome and returns a fresh copy.
     Raises ValueError if creature not found.
     """
-    # Check boss registry first
-    if name in BOSS_REGISTRY:
-        return copy.deepcopy(BOSS_REGISTRY[name])
-
-    # Search all biomes
-    for biome_data in CREATURE_REGISTRY.values():
-        for terrain_data in biome_data.values():
-            if name in terrain_data:
-                return copy.deepcopy(terrain_data[name])
-
-    raise ValueError(f"Unknown creature: {name}")
+    template = _NAME_INDEX.get(name)
+    if template is None:
+        raise ValueError(f"Unknown creature: {name}")
+    return _clone_creature(template)
 
 
 def get_boss(name: str) -> Optional[Creature]:
-    """Get a boss creature by name. Returns a deep copy."""
-    if name in BOSS_REGISTRY:
-        return copy.deepcopy(BOSS_REGISTRY[name])
-    return None
+    """Get a boss creature by name. Returns a fresh copy."""
+    template = BOSS_REGISTRY.get(name)
+    return _clone_creature(template) if template is not None else None
 
 
 # Mapping of biomes to their terrain types and associated creatures
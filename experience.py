@@ -1,8 +1,12 @@
 """Experience and tier progression system based on GAME_MECHANICS.md."""
 
-from typing import Optional
+from dataclasses import dataclass
+from typing import Any, Callable, Optional, Sequence
 
-from game_data import Creature, Encounter, Player
+from abilities import get_team_view, get_unit_indices
+from ai import clear_damage_cache
+from combat import grid_index_to_coords
+from game_data import Creature, Encounter, Player, get_tier_bonus_map
 
 
 def get_max_tier(creature: Creature) -> int:
@@ -10,15 +14,7 @@ def get_max_tier(creature: Creature) -> int:
 
     Returns 0 if no tier_bonuses are defined.
     """
-    if not creature.tier_bonuses:
-        return 0
-
-    max_tier = 0
-    for bonus in creature.tier_bonuses:
-        tier = bonus.get("tier", 0)
-        if tier > max_tier:
-            max_tier = tier
-    return max_tier
+    return max((tier or 0 for tier in get_tier_bonus_map(creature.tier_bonuses)), default=0)
 
 
 def get_base_battles_for_tier(creature: Creature, tier: int) -> Optional[int]:
@@ -26,14 +22,8 @@ def get_base_battles_for_tier(creature: Creature, tier: int) -> Optional[int]:
 
     Returns None if the tier is not defined in tier_bonuses.
     """
-    if not creature.tier_bonuses:
-        return None
-
-    for bonus in creature.tier_bonuses:
-        if bonus.get("tier") == tier:
-            return bonus.get("battles")
-
-    return None
+    bonuses = get_tier_bonus_map(creature.tier_bonuses).get(tier)
+    return bonuses[0].get("battles") if bonuses else None
 
 
 def get_battles_for_tier(creature: Creature, tier: int, hero_int: int = 0) -> Optional[int]:
@@ -77,53 +67,84 @@ def check_tier_upgrade(creature: Creature, hero_int: int) -> bool:
     return False
 
 
+def _describe_attack_abilities(attack_abilities: dict[str, Sequence[str]]) -> list[str]:
+    """Describe abilities a tier adds to existing attacks, one line per ability."""
+    return [
+        f"{atk_type.title()} gains {ability}"
+        for atk_type, abilities in attack_abilities.items()
+        for ability in abilities
+    ]
+
+
+# Tier bonus key -> description lines for its value, in display order
+_BONUS_DESCRIBERS: dict[str, Callable[[Any], list[str]]] = {
+    "max_health": lambda val: [f"+{val} Max HP"],
+    "defense": lambda val: [f"+{val} Defense"],
+    "dodge": lambda val: [f"+{val} Dodge"],
+    "resistance": lambda val: [f"+{val} Resistance"],
+    "conversion_efficacy": lambda val: [f"{'+' if val >= 0 else ''}{val}% Efficacy"],
+    "melee_damage": lambda val: [f"+{val} Melee Damage"],
+    "ranged_damage": lambda val: [f"+{val} Ranged Damage"],
+    "magic_damage": lambda val: [f"+{val} Magic Damage"],
+    "new_attack": lambda atk: [f"New Attack: {atk['type']} ({atk['damage']})"],
+    "attack_abilities": _describe_attack_abilities,
+    "abilities": lambda abilities: [f"Ability: {ability}" for ability in abilities],
+    "healing_bonus": lambda val: [f"+{val} Healing"],
+    "size": lambda size: ["Grows to 2x2!"] if size == "2x2" else [],
+}
+
+
+# id(per-tier bonus tuple) -> (that tuple, its description lines); only used for
+# frozen (tuple) tier_bonuses, whose per-tier tuples are shared and long-lived
+_tier_descriptions: dict[int, tuple[tuple[dict, ...], tuple[str, ...]]] = {}
+_TIER_DESCRIPTION_CACHE_SIZE = 256
+
+
 def get_tier_bonus_description(creature: Creature, tier: int) -> list[str]:
     """Get human-readable descriptions of bonuses for a tier.
 
     Returns list of bonus descriptions.
     """
+    bonuses = get_tier_bonus_map(creature.tier_bonuses).get(tier)
+    if not bonuses:
+        return []
+    cacheable = isinstance(creature.tier_bonuses, tuple)
+    cached = _tier_descriptions.get(id(bonuses)) if cacheable else None
+    if cached is not None:
+        return list(cached[1])
+
     descriptions = []
-    if not creature.tier_bonuses:
-        return descriptions
+    for bonus in bonuses:
+        for key, describe in _BONUS_DESCRIBERS.items():
+            if key in bonus:
+                descriptions.extend(describe(bonus[key]))
+
+    if cacheable:
+        if len(_tier_descriptions) >= _TIER_DESCRIPTION_CACHE_SIZE:
+            _tier_descriptions.clear()
+        _tier_descriptions[id(bonuses)] = (bonuses, tuple(descriptions))
+    return descriptions
 
-    for bonus in creature.tier_bonuses:
-        if bonus.get("tier") != tier:
-            continue
 
-        if "max_health" in bonus:
-            descriptions.append(f"+{bonus['max_health']} Max HP")
-        if "defense" in bonus:
-            descriptions.append(f"+{bonus['defense']} Defense")
-        if "dodge" in bonus:
-            descriptions.append(f"+{bonus['dodge']} Dodge")
-        if "resistance" in bonus:
-            descriptions.append(f"+{bonus['resistance']} Resistance")
-        if "conversion_efficacy" in bonus:
-            val = bonus['conversion_efficacy']
-            sign = "+" if val >= 0 else ""
-            descriptions.append(f"{sign}{val}% Efficacy")
-        if "melee_damage" in bonus:
-            descriptions.append(f"+{bonus['melee_damage']} Melee Damage")
-        if "ranged_damage" in bonus:
-            descriptions.append(f"+{bonus['ranged_damage']} Ranged Damage")
-        if "magic_damage" in bonus:
-            descriptions.append(f"+{bonus['magic_damage']} Magic Damage")
-        if "new_attack" in bonus:
-            atk = bonus["new_attack"]
-            descriptions.append(f"New Attack: {atk['type']} ({atk['damage']})")
-        if "attack_abilities" in bonus:
-            for atk_type, abilities in bonus["attack_abilities"].items():
-                for ability in abilities:
-                    descriptions.append(f"{atk_type.title()} gains {ability}")
-        if "abilities" in bonus:
-            for ability in bonus["abilities"]:
-                descriptions.append(f"Ability: {ability}")
-        if "healing_bonus" in bonus:
-            descriptions.append(f"+{bonus['healing_bonus']} Healing")
-        if "size" in bonus and bonus["size"] == "2x2":
-            descriptions.append("Grows to 2x2!")
+@dataclass(slots=True)
+class ParticipantRecord:
+    """A creature that gained a battle from the encounter."""
 
-    return descriptions
+    creature: Creature
+    name: str
+    battles_before: int
+    battles_after: int
+
+
+@dataclass(slots=True)
+class TierUpRecord:
+    """A creature that reached a new tier, with its bonus descriptions."""
+
+    creature: Creature
+    name: str
+    old_tier: int
+    new_tier: int
+    bonuses: list[str]
 
 
 def end_battle_experience(
@@ -133,28 +154,20 @@ def end_battle_experience(
     """Award experience at battle end.
 
     Returns dict with:
-        - 'participants': list of dicts with creature info and exp gain
-        - 'tier_ups': list of dicts with creature, new tier, and bonus descriptions
+        - 'participants': list of ParticipantRecord with creature info and exp gain
+        - 'tier_ups': list of TierUpRecord with creature, new tier, and bonus descriptions
         - 'grew_to_2x2': list of creatures that grew to 2x2 (need re-placement)
     """
     participants = []
     tier_ups = []
     grew_to_2x2 = []
 
-    # Track unique creatures (for 2x2 units that appear multiple times)
-    processed_ids = set()
-
-    for unit in encounter.player_team or []:
-        if unit is None or isinstance(unit, Player):
-            continue
-
-        if not isinstance(unit, Creature):
-            continue
-
-        # Skip if already processed (2x2 units)
-        if id(unit) in processed_ids:
+    # Each unique unit once (2x2 units fill several slots), in grid order
+    view = get_team_view(encounter.player_team)
+    for slots in view.slots_by_id.values():
+        unit = view.units[slots[0]]
+        if not isinstance(unit, Creature):  # The hero
             continue
-        processed_ids.add(id(unit))
 
         # Record battles before increment
         old_battles = unit.battles_completed
@@ -165,29 +178,20 @@ def end_battle_experience(
         unit.battles_completed += 1
 
         # Record participant
-        participants.append({
-            "creature": unit,
-            "name": unit.name,
-            "battles_before": old_battles,
-            "battles_after": unit.battles_completed,
-        })
-
-        # Check for tier upgrade
-        if check_tier_upgrade(unit, player.intelligence):
-            new_tier = unit.tier
-            bonuses = get_tier_bonus_description(unit, new_tier)
-            tier_ups.append({
-                "creature": unit,
-                "name": unit.name,
-                "old_tier": old_tier,
-                "new_tier": new_tier,
-                "bonuses": bonuses,
-            })
+        participants.append(ParticipantRecord(unit, unit.name, old_battles, unit.battles_completed))
+
+        # Check for tier upgrade (units with base_requirement 0 never progress)
+        if unit.base_requirement and check_tier_upgrade(unit, player.intelligence):
+            bonuses = get_tier_bonus_description(unit, unit.tier)
+            tier_ups.append(TierUpRecord(unit, unit.name, old_tier, unit.tier, bonuses))
 
             # Check if grew to 2x2
             if unit.size == "2x2" and old_size == "1x1":
                 grew_to_2x2.append(unit)
 
+    if tier_ups:
+        clear_damage_cache(encounter)
+
     return {
         "participants": participants,
         "tier_ups": tier_ups,
@@ -207,17 +211,14 @@ def handle_growth_to_2x2(
 
     Returns True if creature was moved to pending_recruits.
     """
-    from gameplay import is_2x2_placement_valid, place_2x2_unit, grid_index_to_coords
+    # gameplay imports this module at load time, so its helpers are imported here
+    from gameplay import is_2x2_placement_valid, place_2x2_unit
 
     # Find creature's current position
-    current_idx = None
-    for idx, unit in enumerate(encounter.player_team or []):
-        if unit is creature:
-            current_idx = idx
-            break
-
-    if current_idx is None:
+    slots = get_unit_indices(creature, encounter.player_team)
+    if not slots:
         return False
+    current_idx = slots[0]
 
     col, row = grid_index_to_coords(current_idx)
 
@@ -238,12 +239,14 @@ def handle_growth_to_2x2(
             encounter.player_team[current_idx] = None
             # Place as 2x2
             displaced = place_2x2_unit(encounter.player_team, creature, start_col, start_row)
+            clear_damage_cache(encounter)
             # Displaced units go to recruits
             pending_recruits.extend(displaced)
             return False
 
     # No valid placement - remove and add to pending recruits
     encounter.player_team[current_idx] = None
+    clear_damage_cache(encounter)
     pending_recruits.append(creature)
     return True
 
@@ -259,18 +262,14 @@ def get_tier_progress(creature: Creature, hero_int: int) -> dict:
     Returns dict with current tier, battles completed, and battles needed for next tier.
     INT reduces thresholds by 1 per 5 INT.
     """
-    if creature.base_requirement == 0:
-        return {
-            "tier": creature.tier,
-            "battles": creature.battles_completed,
-            "next_tier_battles": None,
-            "progress_percent": 100,
-        }
-
-    next_tier = creature.tier + 1
-    battles_needed = get_battles_for_tier(creature, next_tier, hero_int)
-
-    # If no more tiers defined, show as maxed out
+    # No progression if base_requirement is 0; otherwise look up the next tier
+    battles_needed = (
+        get_battles_for_tier(creature, creature.tier + 1, hero_int)
+        if creature.base_requirement
+        else None
+    )
+
+    # If the creature never progresses or no more tiers are defined, show as maxed out
     if battles_needed is None:
         return {
             "tier": creature.tier,
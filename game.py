@@ -1,20 +1,17 @@
 #!/usr/bin/env python3
 import pygame
-import pygame.freetype
 import random
 from game_data import GRID_HEIGHT, GRID_WIDTH, LEFT_PANEL_WIDTH
 from gameplay import generate_map
-from graphics import SpriteManager
+from graphics import DEFAULT_FONT_PATH, SpriteManager, get_tile_size
 from pygame_screens import EncounterScreen, EncounterStartScreen, MainMenu, MapView, Screen, WinScreen, GameOverScreen, BiomeOrderScreen, TeamArrangementScreen, BattleResultsScreen, StatAllocationScreen, ExitConfirmationScreen
 
 SCALE = 1
 
-# Initialize to calculate screen dimensions
-pygame.freetype.init()
-_temp_sm = SpriteManager(scale=SCALE)
-SCREEN_WIDTH = (GRID_WIDTH + LEFT_PANEL_WIDTH) * _temp_sm.tile_width
-SCREEN_HEIGHT = GRID_HEIGHT * _temp_sm.tile_height
-del _temp_sm
+# Screen dimensions from the tile size (measured once and reused by the SpriteManager)
+_tile_width, _tile_height = get_tile_size(DEFAULT_FONT_PATH, SCALE)
+SCREEN_WIDTH = (GRID_WIDTH + LEFT_PANEL_WIDTH) * _tile_width
+SCREEN_HEIGHT = GRID_HEIGHT * _tile_height
 
 
 class Game:
@@ -39,6 +36,8 @@ class Game:
         self.exit_confirmation_screen = ExitConfirmationScreen()
         self.current_back_screen = self.main_menu
         self.current_front_screen = None
+        # Set whenever something may have changed on screen; cleared by render()
+        self.needs_redraw = True
 
     def reset_game(self):
         biomes = ["forest", "plains", "snow", "underground"]
@@ -57,6 +56,7 @@ class Game:
 
     def handle_event(self, event: pygame.event.Event) -> None:
         self.current_screen().handle_event(event, self)
+        self.needs_redraw = True
 
     def update(self) -> None:
         """Called each frame for time-based updates like auto-walk."""
@@ -89,6 +89,7 @@ class Game:
             self.screen.fill((0, 0, 0))
             scaled = pygame.transform.scale(self.render_surface, (scaled_w, scaled_h))
             self.screen.blit(scaled, (offset_x, offset_y))
+        self.needs_redraw = False
 
 def main():
     pygame.init()
@@ -98,14 +99,24 @@ def main():
     game = Game(screen)
     clock = pygame.time.Clock()
 
-    while game.running:
-        for event in pygame.event.get():
-            game.handle_event(event)
+    # Bind per-frame calls once so the loop body avoids repeated global/attribute lookups
+    get_events = pygame.event.get
+    handle_event = game.handle_event
+    update = game.update
+    render = game.render
+    flip = pygame.display.flip
+    tick = clock.tick
 
-        game.update()
-        game.render()
-        pygame.display.flip()
-        clock.tick(60)
+    while game.running:
+        for event in get_events():
+            handle_event(event)
+
+        update()
+        # The game is turn-based, so idle frames (no input, no auto-walk step) are skipped
+        if game.needs_redraw:
+            render()
+            flip()
+        tick(60)
 
     pygame.quit()
 
@@ -1,7 +1,9 @@
 """Data classes and constants for the game."""
 
+import itertools
 from dataclasses import dataclass, field
-from typing import Optional
+from enum import IntEnum
+from typing import Optional, Sequence, Union
 
 # Grid dimensions
 GRID_WIDTH = 50
@@ -9,7 +11,144 @@ GRID_HEIGHT = 25
 LEFT_PANEL_WIDTH = 16  # Width of left UI panel in tiles
 
 
-@dataclass
+class AttackKind(IntEnum):
+    """Attack types. str()/format() give the lowercase name used in data and UI."""
+
+    MELEE = 0
+    RANGED = 1
+    MAGIC = 2
+
+    def __str__(self) -> str:
+        return self.name.lower()
+
+    def __format__(self, format_spec: str) -> str:
+        return format(str(self), format_spec)
+
+    @classmethod
+    def from_str(cls, name: str) -> "AttackKind":
+        """Convert 'melee' | 'ranged' | 'magic' to an AttackKind."""
+        return cls[name.upper()]
+
+
+# Tier bonus keys that add directly to the Creature stat of the same name
+STAT_BONUS_KEYS = frozenset({"max_health", "defense", "dodge", "resistance", "conversion_efficacy"})
+
+# Tier bonus keys for per-attack-type damage, indexed by AttackKind
+DAMAGE_BONUS_KEYS = ("melee_damage", "ranged_damage", "magic_damage")
+
+
+# Ability bit flags (precomputed from ability strings for fast checks)
+FLYING = 1 << 0
+HASTE = 1 << 1
+LIFELINK = 1 << 2
+GUARDIAN = 1 << 3
+PROTECTOR = 1 << 4
+SHIELD_WALL = 1 << 5
+PACK_HUNTER = 1 << 6
+PIERCING = 1 << 7
+SPLASH = 1 << 8
+EVASION = 1 << 9
+HEALING = 1 << 10
+
+ABILITY_FLAGS = {
+    "Flying": FLYING,
+    "Haste": HASTE,
+    "Lifelink": LIFELINK,
+    "Guardian": GUARDIAN,
+    "Protector": PROTECTOR,
+    "Shield Wall": SHIELD_WALL,
+    "Pack Hunter": PACK_HUNTER,
+    "Piercing": PIERCING,
+    "Splash": SPLASH,
+}
+
+
+def build_ability_index(abilities: Optional[list[str]]) -> dict[str, Optional[int]]:
+    """Index abilities by every whole-word prefix, mapped to the number that follows it.
+
+    'Evasion 50%' indexes 'Evasion' -> 50 and 'Evasion 50%' -> None;
+    'Shield Wall' indexes 'Shield' -> None and 'Shield Wall' -> None.
+    The first ability providing a key wins.
+    """
+    index: dict[str, Optional[int]] = {}
+    for ability in abilities or []:
+        words = ability.split()
+        for n in range(1, len(words) + 1):
+            value = None
+            if n < len(words):
+                try:
+                    value = int(words[n].rstrip("%"))
+                except ValueError:
+                    pass
+            index.setdefault(" ".join(words[:n]), value)
+    return index
+
+
+def parse_attack_range(range_str: str) -> tuple[Optional[int], Optional[int]]:
+    """Parse a tier bonus attack range like '2-3' into (range_min, range_max)."""
+    if range_str and "-" in range_str:
+        parts = range_str.split("-")
+        return int(parts[0]), int(parts[1])
+    return None, None
+
+
+# Interned creature names (name -> small int id) for cheap identity comparisons
+_NAME_IDS: dict[str, int] = {}
+
+
+def intern_name(name: str) -> int:
+    """Get the interned integer id for a unit name."""
+    name_id = _NAME_IDS.get(name)
+    if name_id is None:
+        name_id = _NAME_IDS[name] = len(_NAME_IDS)
+    return name_id
+
+
+DRAGON_KING_ID = intern_name("Dragon King")
+
+
+# Tier bonuses grouped by tier, keyed by id() of an immutable tier_bonuses tuple (the
+# registry freezes templates to tuples). Entries hold a reference to their source so
+# ids stay unique while cached. Lists can be appended to, so they are grouped fresh.
+_tier_bonus_maps: dict[int, tuple[Sequence[dict], dict[Optional[int], tuple[dict, ...]]]] = {}
+_TIER_BONUS_MAP_CACHE_SIZE = 256
+
+
+def get_tier_bonus_map(tier_bonuses: Optional[Sequence[dict]]) -> dict[Optional[int], tuple[dict, ...]]:
+    """Group tier bonus dicts by their 'tier' key, preserving order within a tier."""
+    if not tier_bonuses:
+        return {}
+    cacheable = isinstance(tier_bonuses, tuple)
+    if cacheable:
+        cached = _tier_bonus_maps.get(id(tier_bonuses))
+        if cached is not None:
+            return cached[1]
+    grouped: dict[Optional[int], list[dict]] = {}
+    for bonus in tier_bonuses:
+        grouped.setdefault(bonus.get("tier"), []).append(bonus)
+    by_tier = {tier: tuple(bonuses) for tier, bonuses in grouped.items()}
+    if not cacheable:
+        return by_tier
+    if len(_tier_bonus_maps) >= _TIER_BONUS_MAP_CACHE_SIZE:
+        _tier_bonus_maps.clear()
+    _tier_bonus_maps[id(tier_bonuses)] = (tier_bonuses, by_tier)
+    return by_tier
+
+
+def compute_ability_flags(abilities: Optional[list[str]]) -> int:
+    """Pack a list of ability names into an ability bit flag mask."""
+    flags = 0
+    for ability in abilities or []:
+        if ability in ABILITY_FLAGS:
+            flags |= ABILITY_FLAGS[ability]
+        elif ability.startswith("Evasion"):
+            flags |= EVASION
+        elif ability.startswith("Healing"):
+            flags |= HEALING
+    return flags
+
+
+@dataclass(slots=True)
 class Placeable:
     """A base class for objects that can be placed on the grid."""
 
@@ -21,14 +160,14 @@ class Placeable:
     bg_color: Optional[tuple[int, int, int]] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Terrain(Placeable):
     """Represents terrain tiles on the map."""
 
     visible: bool = True
     tile_type: Optional[str] = None  # For collision detection (e.g., "wall")
 
-@dataclass
+@dataclass(slots=True)
 class Exit(Placeable):
     """Represents the exit to the next level."""
     visible: bool = True
@@ -36,18 +175,35 @@ class Exit(Placeable):
     color: tuple[int, int, int] = (255, 255, 255)
 
 
-@dataclass
+@dataclass(slots=True)
 class Attack:
     """Represents a single attack a creature can perform."""
 
-    attack_type: str  # "melee" | "ranged" | "magic"
+    attack_type: AttackKind  # Strings ("melee" | "ranged" | "magic") are converted on init
     damage: int
     range_min: Optional[int] = None  # For ranged attacks
     range_max: Optional[int] = None
     abilities: list[str] = field(default_factory=list)  # Piercing, Splash, Weakening, etc.
 
+    # Ability bit flags (derived from abilities, refreshed when they change)
+    ability_flags: int = field(default=0, init=False, repr=False, compare=False)
 
-@dataclass
+    def __post_init__(self):
+        """Normalize the attack type and abilities, and precompute ability flags."""
+        if isinstance(self.attack_type, str):
+            self.attack_type = AttackKind.from_str(self.attack_type)
+        else:  # Plain ints, e.g. after an asdict()/JSON round-trip
+            self.attack_type = AttackKind(self.attack_type)
+        if self.abilities is None:
+            self.abilities = []
+        self.refresh_ability_cache()
+
+    def refresh_ability_cache(self) -> None:
+        """Re-derive ability flags after abilities change."""
+        self.ability_flags = compute_ability_flags(self.abilities)
+
+
+@dataclass(slots=True)
 class Creature:
     """Represents a creature that can be encountered or on the player's team."""
 
@@ -58,7 +214,7 @@ class Creature:
 
     # Size support for 2x2 units
     size: str = "1x1"  # "1x1" or "2x2"
-    glyphs: Optional[list[str]] = None  # [TL, TR, BL, BR] for 2x2 units
+    glyphs: Optional[Sequence[str]] = None  # [TL, TR, BL, BR] for 2x2 units
 
     # Combat stats
     max_health: int = 10
@@ -82,94 +238,98 @@ class Creature:
     tier: int = 0  # 0, 1, 2, or 3
     battles_completed: int = 0
     base_requirement: int = 5  # Base battles needed for tier 1
-    tier_bonuses: list[dict] = field(default_factory=list)  # Per-tier stat/ability unlocks
+    tier_bonuses: Sequence[dict] = field(default_factory=list)  # Per-tier stat/ability unlocks (read-only)
+
+    # Interned name id (see intern_name)
+    name_id: int = field(default=0, init=False, repr=False, compare=False)
+
+    # Ability flags and parsed values (derived from abilities, refreshed when they change)
+    ability_flags: int = field(default=0, init=False, repr=False, compare=False)
+    ability_index: dict[str, Optional[int]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    evasion_pct: int = field(default=0, init=False, repr=False, compare=False)
+    healing_amt: int = field(default=0, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        """Normalize None lists, intern the name and precompute ability values."""
+        if self.attacks is None:
+            self.attacks = []
+        if self.abilities is None:
+            self.abilities = []
+        self.name_id = intern_name(self.name)
+        self.refresh_ability_cache()
+
+    def refresh_ability_cache(self) -> None:
+        """Re-derive ability flags and values after abilities change."""
+        self.ability_flags = compute_ability_flags(self.abilities)
+        index = self.ability_index = build_ability_index(self.abilities)
+        self.evasion_pct = index.get("Evasion") or 0
+        self.healing_amt = index.get("Healing") or 0
 
     def apply_tier_bonus(self, tier: int) -> None:
         """Apply stat and ability bonuses for a specific tier."""
-        if not self.tier_bonuses:
+        bonuses = get_tier_bonus_map(self.tier_bonuses).get(tier)
+        if not bonuses:
             return
 
-        for bonus in self.tier_bonuses:
-            if bonus.get("tier") != tier:
-                continue
-
-            # Stat bonuses
+        for bonus in bonuses:
+            # Stat bonuses, driven by the keys the bonus actually has
+            for key, value in bonus.items():
+                if key in STAT_BONUS_KEYS:
+                    setattr(self, key, getattr(self, key) + value)
             if "max_health" in bonus:
-                self.max_health += bonus["max_health"]
                 self.current_health += bonus["max_health"]
-            if "defense" in bonus:
-                self.defense += bonus["defense"]
-            if "dodge" in bonus:
-                self.dodge += bonus["dodge"]
-            if "resistance" in bonus:
-                self.resistance += bonus["resistance"]
-            if "conversion_efficacy" in bonus:
-                self.conversion_efficacy += bonus["conversion_efficacy"]
-
-            # Attack damage bonuses
-            if "melee_damage" in bonus:
-                for attack in self.attacks or []:
-                    if attack.attack_type == "melee":
-                        attack.damage += bonus["melee_damage"]
-            if "ranged_damage" in bonus:
-                for attack in self.attacks or []:
-                    if attack.attack_type == "ranged":
-                        attack.damage += bonus["ranged_damage"]
-            if "magic_damage" in bonus:
-                for attack in self.attacks or []:
-                    if attack.attack_type == "magic":
-                        attack.damage += bonus["magic_damage"]
+
+            # Damage bonuses only apply to attacks held before this tier's new attack
+            damage_bonus = tuple(bonus.get(key, 0) for key in DAMAGE_BONUS_KEYS)
+            bonus_attack_count = len(self.attacks) if any(damage_bonus) else 0
 
             # New attack
             if "new_attack" in bonus:
                 new_atk = bonus["new_attack"]
-                range_str = new_atk.get("range", "")
-                range_min, range_max = None, None
-                if range_str and "-" in range_str:
-                    parts = range_str.split("-")
-                    range_min = int(parts[0])
-                    range_max = int(parts[1])
+                if "range_min" in new_atk:  # Pre-parsed at registry load
+                    range_min, range_max = new_atk["range_min"], new_atk["range_max"]
+                else:
+                    range_min, range_max = parse_attack_range(new_atk.get("range", ""))
 
                 attack = Attack(
                     attack_type=new_atk["type"],
                     damage=new_atk["damage"],
                     range_min=range_min,
                     range_max=range_max,
-                    abilities=new_atk.get("abilities", []),
+                    abilities=list(new_atk.get("abilities", [])),  # Not shared with the template
                 )
-                if self.attacks is None:
-                    self.attacks = []
                 self.attacks.append(attack)
 
-            # Attack ability additions
-            if "attack_abilities" in bonus:
-                for attack_type, abilities in bonus["attack_abilities"].items():
-                    for attack in self.attacks or []:
-                        if attack.attack_type == attack_type:
-                            if attack.abilities is None:
-                                attack.abilities = []
-                            attack.abilities.extend(abilities)
+            # Attack damage bonuses and ability additions, in one pass over the attacks
+            attack_abilities = {
+                AttackKind.from_str(attack_type): abilities
+                for attack_type, abilities in bonus.get("attack_abilities", {}).items()
+            }
+            if bonus_attack_count or attack_abilities:
+                for i, attack in enumerate(self.attacks):
+                    if i < bonus_attack_count:
+                        attack.damage += damage_bonus[attack.attack_type]
+                    added = attack_abilities.get(attack.attack_type)
+                    if added:
+                        attack.abilities.extend(added)
+                        attack.refresh_ability_cache()
 
             # Ability unlocks
             if "abilities" in bonus:
-                if self.abilities is None:
-                    self.abilities = []
                 for ability in bonus["abilities"]:
                     if ability not in self.abilities:
                         self.abilities.append(ability)
+                self.refresh_ability_cache()  # Keep healing_amt current for healing_bonus below
 
             # Healing bonus (increases Healing X amount)
-            if "healing_bonus" in bonus:
-                if self.abilities:
-                    for i, ability in enumerate(self.abilities):
-                        if ability.startswith("Healing"):
-                            parts = ability.split()
-                            if len(parts) >= 2:
-                                try:
-                                    current_val = int(parts[1])
-                                    self.abilities[i] = f"Healing {current_val + bonus['healing_bonus']}"
-                                except ValueError:
-                                    pass
+            # The amount is already parsed into healing_amt; only the display string is rewritten.
+            # Like build_ability_index, the first ability whose first word is Healing provides it
+            if "healing_bonus" in bonus and self.healing_amt:
+                slot = next(i for i, ability in enumerate(self.abilities) if ability.split()[:1] == ["Healing"])
+                self.healing_amt += bonus["healing_bonus"]
+                self.abilities[slot] = f"Healing {self.healing_amt}"
 
             # Size change (Spider, Slime grow to 2x2)
             if "size" in bonus and bonus["size"] == "2x2":
@@ -177,6 +337,8 @@ class Creature:
                 if "glyphs" in bonus:
                     self.glyphs = bonus["glyphs"]
 
+        self.refresh_ability_cache()
+
     def set_tier(self, target_tier: int) -> None:
         """Set creature to a specific tier, applying all bonuses from tier 1 up to target."""
         for t in range(self.tier + 1, target_tier + 1):
@@ -184,7 +346,7 @@ class Creature:
         self.tier = target_tier
 
 
-@dataclass
+@dataclass(slots=True)
 class Encounter(Placeable):
     """Represents an encounter trigger on the map."""
 
@@ -198,6 +360,10 @@ class Encounter(Placeable):
     turn_number: int = 0
     combat_log: list[str] = None  # Log of combat events
 
+    # Enemy damage per target square (see ai.get_damage_grid); None until computed
+    # and reset by ai.clear_damage_cache whenever the teams change
+    damage_grid: Optional[list[int]] = field(default=None, init=False, repr=False, compare=False)
+
     def __post_init__(self):
         """Initialize mutable default values."""
         if self.creatures is None:
@@ -210,7 +376,7 @@ class Encounter(Placeable):
             self.combat_log = []
 
 
-@dataclass
+@dataclass(slots=True)
 class Player(Placeable):
     """Represents the player in the game."""
 
@@ -219,6 +385,17 @@ class Player(Placeable):
     color: tuple[int, int, int] = (0, 255, 0)
     name: str = "Player"
 
+    # Creature-compatible constants so unit code can read attributes directly
+    # (heroes are always 1x1, have no passive abilities, and get their attacks
+    # from get_hero_attacks)
+    size = "1x1"
+    attacks = ()
+    abilities = ()
+    ability_flags = 0
+    ability_index = {}  # Shared and never mutated
+    evasion_pct = 0
+    healing_amt = 0
+
     # Hero attributes (affect allies and hero combat)
     intelligence: int = 0  # Reduces tier requirements, boosts ranged attack/dodge
     wisdom: int = 0  # +1 all defenses per +4 to allies, boosts melee attack/defense
@@ -249,11 +426,82 @@ class Player(Placeable):
     # Progress tracking
     battles_won: int = 0  # Total battles won
 
+    # Combat state
+    debuffs: dict[str, int] = field(default_factory=dict)  # {"weakened": 2} - stacks
+
     def __post_init__(self):
         """Initialize mutable default values."""
         if self.creatures is None:
             self.creatures = [None] * 9
 
+    @property
+    def name_id(self) -> int:
+        """Interned name id (see intern_name)."""
+        return intern_name(self.name)
+
+    # Creature-compatible stat names (a hero's defenses are its base stats)
+    @property
+    def defense(self) -> int:
+        return self.base_defense
+
+    @property
+    def dodge(self) -> int:
+        return self.base_dodge
+
+    @property
+    def resistance(self) -> int:
+        return self.base_resistance
+
+
+@dataclass(frozen=True)
+class TeamView:
+    """Structure-of-arrays snapshot of a 9-slot team grid.
+
+    Each per-slot tuple is indexed by grid position; empty slots hold None/0.
+    2x2 units appear in every slot they occupy.
+    """
+
+    units: tuple[Optional[Union[Creature, Player]], ...]
+    unit_ids: tuple[int, ...]
+    ability_flags: tuple[int, ...]
+    team_flags: int  # OR of every unit's ability_flags
+    defense: tuple[int, ...]
+    dodge: tuple[int, ...]
+    resistance: tuple[int, ...]
+    slots_by_id: dict[int, tuple[int, ...]]  # id(unit) -> occupied slots, ascending
+    name_id_counts: dict[int, int]  # name_id -> number of occupied slots
+
+    @classmethod
+    def from_team(cls, team: Optional[list]) -> "TeamView":
+        """Build a snapshot of the given team grid."""
+        units = tuple(team or [])
+        slots_by_id: dict[int, tuple[int, ...]] = {}
+        name_id_counts: dict[int, int] = {}
+        for idx, unit in enumerate(units):
+            if unit is not None:
+                slots_by_id[id(unit)] = slots_by_id.get(id(unit), ()) + (idx,)
+                name_id = unit.name_id
+                name_id_counts[name_id] = name_id_counts.get(name_id, 0) + 1
+        ability_flags = tuple(u.ability_flags if u is not None else 0 for u in units)
+        team_flags = 0
+        for flags in ability_flags:
+            team_flags |= flags
+        return cls(
+            units=units,
+            unit_ids=tuple(map(id, units)),
+            ability_flags=ability_flags,
+            team_flags=team_flags,
+            defense=tuple(u.defense if u is not None else 0 for u in units),
+            dodge=tuple(u.dodge if u is not None else 0 for u in units),
+            resistance=tuple(u.resistance if u is not None else 0 for u in units),
+            slots_by_id=slots_by_id,
+            name_id_counts=name_id_counts,
+        )
+
+
+# Source of GameState.map_version values, unique across all gamestates
+_map_versions = itertools.count(1)
+
 
 @dataclass
 class GameState:
@@ -270,6 +518,15 @@ class GameState:
     last_battle_results: Optional[dict] = None  # Results from last battle for display
     pending_next_stage: bool = False  # True when player used exit and needs to advance after stat allocation
 
+    # Changes whenever the map's placeables do (see mark_map_changed); renderers
+    # key cached map layers on it
+    map_version: int = field(default=0, init=False, repr=False, compare=False)
+
     def __post_init__(self):
         if self.pending_recruits is None:
             self.pending_recruits = []
+        self.mark_map_changed()
+
+    def mark_map_changed(self) -> None:
+        """Record that placeables were added, removed, replaced or edited."""
+        self.map_version = next(_map_versions)
@@ -3,12 +3,15 @@
 from typing import Optional, Union
 import random
 
-from game_data import GRID_HEIGHT, GRID_WIDTH, Attack, Creature, Encounter, Exit, GameState, Player, Terrain
+from game_data import GRID_HEIGHT, GRID_WIDTH, Attack, AttackKind, Creature, Encounter, Exit, GameState, Player, Terrain
 from terrain_gen import generate_biome_terrain, generate_maze, maze_to_grid_walls, get_corner_cell_center
 from creatures import spawn_creature, get_creature_for_terrain, BIOME_TERRAIN_CREATURES
 from combat import (
+    ATTACK_META,
+    calculate_conversion_points,
     calculate_damage,
     calculate_effective_efficacy,
+    get_debuff_reduction,
     get_melee_target,
     get_ranged_targets,
     get_magic_targets,
@@ -30,8 +33,10 @@ from abilities import (
     get_effective_defense,
     get_effective_attack_damage,
     calculate_pack_hunter_bonus,
+    get_unit_indices,
 )
 from experience import end_battle_experience, award_floor_stats, get_base_battles_for_tier
+from ai import clear_damage_cache
 
 
 def add_combat_log(encounter: Encounter, message: str) -> None:
@@ -151,45 +156,44 @@ def advance_step(
 
         # Check bounds and update position if valid
         if 0 <= new_x < GRID_WIDTH and 0 <= new_y < GRID_HEIGHT:
-            # Check for wall collision
-            is_wall = False
-            for placeable in gamestate.placeables or []:
-                if isinstance(placeable, Terrain) and placeable.x == new_x and placeable.y == new_y:
-                    if placeable.tile_type == "wall":
-                        is_wall = True
-                        break
+            # Everything on the destination tile, found in a single pass over the map
+            occupants = [
+                placeable for placeable in gamestate.placeables or []
+                if placeable.x == new_x and placeable.y == new_y
+            ]
 
-            if is_wall:
-                return gamestate  # Can't move into wall
+            # Check for wall collision
+            for placeable in occupants:
+                if isinstance(placeable, Terrain) and placeable.tile_type == "wall":
+                    return gamestate  # Can't move into wall
 
             player.x = new_x
             player.y = new_y
 
             # Check collision with placeables
-            for placeable in gamestate.placeables or []:
-                if placeable.x == player.x and placeable.y == player.y:
-                    # Encounter Trigger
-                    if isinstance(placeable, Encounter):
-                        gamestate.active_encounter = placeable
-                        # Use initialize_encounter for proper setup
-                        initialize_encounter(placeable, player)
-
-                        # If enemy has Haste, execute their turn first
-                        if placeable.current_turn == "enemy":
-                            execute_enemy_turn(gamestate)
-                            placeable.current_turn = "player"
-                            check_encounter_end(gamestate)
-                        break
-
-                    # Exit Trigger
-                    elif isinstance(placeable, Exit):
-                        if gamestate.current_stage < gamestate.max_stages:
-                            # Award stat points for completing the floor
-                            award_floor_stats(player)
-                            # Mark that we need to advance after stat allocation
-                            gamestate.pending_next_stage = True
-                            # Don't generate new map yet - will happen after stat allocation
-                        # No exit on last stage (Boss handles win)
+            for placeable in occupants:
+                # Encounter Trigger
+                if isinstance(placeable, Encounter):
+                    gamestate.active_encounter = placeable
+                    # Use initialize_encounter for proper setup
+                    initialize_encounter(placeable, player)
+
+                    # If enemy has Haste, execute their turn first
+                    if placeable.current_turn == "enemy":
+                        execute_enemy_turn(gamestate)
+                        placeable.current_turn = "player"
+                        check_encounter_end(gamestate)
+                    break
+
+                # Exit Trigger
+                elif isinstance(placeable, Exit):
+                    if gamestate.current_stage < gamestate.max_stages:
+                        # Award stat points for completing the floor
+                        award_floor_stats(player)
+                        # Mark that we need to advance after stat allocation
+                        gamestate.pending_next_stage = True
+                        # Don't generate new map yet - will happen after stat allocation
+                    # No exit on last stage (Boss handles win)
 
     elif action_type == "attack" and gamestate.active_encounter is not None:
         encounter = gamestate.active_encounter
@@ -285,7 +289,7 @@ def resolve_team_attack(
         processed_units.add(id(unit))
 
         # For 2x2 units, use primary (top-left) position
-        if getattr(unit, "size", "1x1") == "2x2":
+        if unit.size == "2x2":
             primary_pos = get_2x2_primary_position(acting_team, unit)
             if primary_pos:
                 attacker_col, attacker_row = primary_pos
@@ -298,10 +302,10 @@ def resolve_team_attack(
         if isinstance(unit, Player):
             attacks = get_hero_attacks(unit)
         else:
-            attacks = unit.attacks or []
+            attacks = unit.attacks
 
         # For 2x2 units, try both rows they occupy for melee attacks
-        is_2x2 = getattr(unit, "size", "1x1") == "2x2"
+        is_2x2 = unit.size == "2x2"
         rows_to_try = [attacker_row]
         if is_2x2 and attacker_row < 2:
             rows_to_try.append(attacker_row + 1)
@@ -331,8 +335,8 @@ def resolve_team_attack(
         unit_attacked = False
 
         for target, tcol, trow in targets:
-            attacker_name = getattr(unit, "name", "Unknown")
-            target_name = getattr(target, "name", "Unknown")
+            attacker_name = unit.name
+            target_name = target.name
 
             # Check evasion
             if check_evasion(target):
@@ -343,17 +347,11 @@ def resolve_team_attack(
 
             # Get effective damage with all bonuses
             effective_damage = get_effective_attack_damage(unit, best_attack, encounter, is_player_turn)
-            modified_attack = Attack(
-                attack_type=best_attack.attack_type,
-                damage=effective_damage,
-                range_min=best_attack.range_min,
-                range_max=best_attack.range_max,
-                abilities=best_attack.abilities,
-            )
 
             # Calculate final damage (includes Flying immunity, defense bonuses)
             damage = calculate_attack_result(
-                modified_attack, unit, target, encounter, is_player_turn, player
+                best_attack, unit, target, encounter, is_player_turn, player,
+                damage_override=effective_damage
             )
 
             # Apply damage
@@ -386,10 +384,10 @@ def resolve_team_attack(
             attackers.append(unit)
 
         # Process Healing ability for magic attacks
-        if best_attack.attack_type == "magic":
+        if best_attack.attack_type is AttackKind.MAGIC:
             healed = process_healing_ability(unit, encounter, is_player_turn)
             if healed:
-                unit_name = getattr(unit, "name", "Unknown")
+                unit_name = unit.name
                 add_combat_log(encounter, f"{unit_name} heals ally for {healed} HP")
                 results.append({"attacker": unit, "healed": healed})
 
@@ -399,6 +397,7 @@ def resolve_team_attack(
 
     # Remove dead units (and update player.creatures if ally dies)
     remove_dead_units(encounter, is_player_turn, player)
+    clear_damage_cache(encounter)
 
     return results
 
@@ -427,21 +426,14 @@ def calculate_expected_result(
     if not targets:
         return 0
 
+    # Get effective damage with all bonuses
+    effective_damage = get_effective_attack_damage(unit, attack, encounter, is_player_turn)
+
     total = 0
     for target, _, _ in targets:
-        # Get effective damage with all bonuses
-        effective_damage = get_effective_attack_damage(unit, attack, encounter, is_player_turn)
-        modified_attack = Attack(
-            attack_type=attack.attack_type,
-            damage=effective_damage,
-            range_min=attack.range_min,
-            range_max=attack.range_max,
-            abilities=attack.abilities,
-        )
-
         result = calculate_attack_result(
-            modified_attack, unit, target, encounter, is_player_turn, player,
-            for_conversion, effective_efficacy
+            attack, unit, target, encounter, is_player_turn, player,
+            for_conversion, effective_efficacy, damage_override=effective_damage
         )
         total += result
 
@@ -490,9 +482,12 @@ def calculate_attack_result(
     player: Player,
     for_conversion: bool = False,
     effective_efficacy: int = 100,
+    damage_override: Optional[int] = None,
 ) -> int:
     """Calculate attack damage or conversion points.
 
+    If damage_override is given it replaces attack.damage (e.g. with bonuses applied).
+
     Shared logic:
     - Flying immunity to melee (returns 0)
     - Debuff reductions (defanged/blinded/silenced/weakened)
@@ -506,61 +501,37 @@ def calculate_attack_result(
     - 50% bonus for low HP targets
     - Uses highest of all defenses
     """
-    import math
-
-    base_value = attack.damage
+    attack_damage = attack.damage if damage_override is None else damage_override
+    base_value = attack_damage
 
     # Flying immunity to melee (shared)
-    if attack.attack_type == "melee" and check_flying(defender):
+    if attack.attack_type is AttackKind.MELEE and check_flying(defender):
         return 0
 
     # Apply debuffs to damage (shared)
-    attacker_debuffs = getattr(attacker, "debuffs", {}) or {}
-    debuff_reduction = 0
-    if attack.attack_type == "melee":
-        debuff_reduction = attacker_debuffs.get("defanged", 0) * 6
-        debuff_reduction += attacker_debuffs.get("weakened", 0) * 3
-    elif attack.attack_type == "ranged":
-        debuff_reduction = attacker_debuffs.get("blinded", 0) * 6
-        debuff_reduction += attacker_debuffs.get("weakened", 0) * 3
-    elif attack.attack_type == "magic":
-        debuff_reduction = attacker_debuffs.get("silenced", 0) * 6
-        debuff_reduction += attacker_debuffs.get("weakened", 0) * 3
+    debuff_reduction = get_debuff_reduction(attack.attack_type, attacker.debuffs)
 
     base_value = max(0, base_value - debuff_reduction)
 
     # If debuffs reduce to 0, still deal minimum 1
-    if attack.damage > 0 and base_value == 0:
+    if attack_damage > 0 and base_value == 0:
         base_value = 1
 
     if base_value == 0:
         return 0
 
     if for_conversion:
-        # Apply efficacy
-        base_value = math.floor(base_value * (effective_efficacy / 100))
-
-        # 50% bonus if target below 50% HP
-        if defender.current_health < defender.max_health / 2:
-            base_value = math.floor(base_value * 1.5)
-
-        # Highest defense stat
-        defense = max(
-            getattr(defender, "defense", 0),
-            getattr(defender, "dodge", 0),
-            getattr(defender, "resistance", 0)
+        return calculate_conversion_points(
+            base_value,
+            effective_efficacy,
+            defender.current_health * 2 < defender.max_health,  # Below 50% HP
+            max(defender.defense, defender.dodge, defender.resistance),  # Highest defense stat
         )
-
-        return max(0, base_value - defense)
     else:
         # Get effective defense with all bonuses
         defender_is_player_side = not is_player_turn
-        if attack.attack_type == "melee":
-            defense = get_effective_defense(defender, "defense", encounter, defender_is_player_side, player)
-        elif attack.attack_type == "ranged":
-            defense = get_effective_defense(defender, "dodge", encounter, defender_is_player_side, player)
-        else:  # magic
-            defense = get_effective_defense(defender, "resistance", encounter, defender_is_player_side, player)
+        defense_type = ATTACK_META[attack.attack_type].defense_attr
+        defense = get_effective_defense(defender, defense_type, encounter, defender_is_player_side, player)
 
         return max(1, base_value - defense)
 
@@ -578,7 +549,7 @@ def get_attack_targets(
     targets = []
     enemy_team = encounter.enemy_team if attacker_is_player else encounter.player_team
 
-    if attack.attack_type == "melee":
+    if attack.attack_type is AttackKind.MELEE:
         target = get_melee_target(
             encounter, attacker_col, attacker_row, attacker_is_player, target_col, target_row
         )
@@ -595,7 +566,7 @@ def get_attack_targets(
             else:
                 targets.append((target, target_col, target_row))
 
-    elif attack.attack_type == "ranged":
+    elif attack.attack_type is AttackKind.RANGED:
         range_min = attack.range_min or 1
         range_max = attack.range_max or 3
         targets = get_ranged_targets(
@@ -610,7 +581,7 @@ def get_attack_targets(
             has_splash(attack),
         )
 
-    elif attack.attack_type == "magic":
+    elif attack.attack_type is AttackKind.MAGIC:
         # Magic hits the mirror column. Only return targets if the user-selected
         # target is in the mirror column, otherwise the attack can't hit the selection.
         mirror_col = 2 - attacker_col
@@ -650,7 +621,7 @@ def resolve_team_convert(
         processed_units.add(id(unit))
 
         # For 2x2 units, use primary (top-left) position
-        if getattr(unit, "size", "1x1") == "2x2":
+        if unit.size == "2x2":
             primary_pos = get_2x2_primary_position(encounter.player_team, unit)
             if primary_pos:
                 attacker_col, attacker_row = primary_pos
@@ -664,7 +635,7 @@ def resolve_team_convert(
             attacks = get_hero_attacks(unit)
             base_efficacy = 100  # Hero base efficacy
         else:
-            attacks = unit.attacks or []
+            attacks = unit.attacks
             base_efficacy = unit.conversion_efficacy
 
         # Calculate effective efficacy with CHA bonus
@@ -690,25 +661,19 @@ def resolve_team_convert(
             if not isinstance(target, Creature):
                 continue  # Can only convert creatures
 
-            converter_name = getattr(unit, "name", "Unknown")
-            target_name = getattr(target, "name", "Unknown")
+            converter_name = unit.name
+            target_name = target.name
 
             # Calculate conversion points with Pack Hunter bonus
             pack_bonus = calculate_pack_hunter_bonus(unit, encounter, True)
-            attack_with_bonus = Attack(
-                attack_type=best_attack.attack_type,
-                damage=best_attack.damage + pack_bonus.get(best_attack.attack_type, 0),
-                range_min=best_attack.range_min,
-                range_max=best_attack.range_max,
-                abilities=best_attack.abilities,
-            )
             conversion = calculate_attack_result(
-                attack_with_bonus, unit, target, encounter, True, player,
-                for_conversion=True, effective_efficacy=effective_efficacy
+                best_attack, unit, target, encounter, True, player,
+                for_conversion=True, effective_efficacy=effective_efficacy,
+                damage_override=best_attack.damage + pack_bonus.get(str(best_attack.attack_type), 0),
             )
 
             if conversion > 0:
-                target.conversion_progress = getattr(target, "conversion_progress", 0) + conversion
+                target.conversion_progress += conversion
                 unit_converted = True
 
                 add_combat_log(encounter, f"{converter_name} converts {target_name} +{conversion}")
@@ -747,6 +712,7 @@ def resolve_team_convert(
     # Clear debuff stacks from converters
     for converter in converters:
         clear_debuff_stacks(converter)
+    clear_damage_cache(encounter)
 
     return results
 
@@ -777,14 +743,15 @@ def resolve_move_action(
     if abs(dx) + abs(dy) != 1:
         return False
 
-    unit_name = getattr(unit, "name", "Unknown")
+    unit_name = unit.name
 
     # Handle 2x2 units specially
-    if getattr(unit, "size", "1x1") == "2x2":
+    if unit.size == "2x2":
         displaced = move_2x2_unit(team, unit, direction)
+        clear_damage_cache(encounter)
         # move_2x2_unit returns [] on failure (no positions found or out of bounds)
         # Need to check if unit actually moved by comparing positions
-        current_positions = [i for i, u in enumerate(team) if u is unit]
+        current_positions = get_unit_indices(unit, team)
         if len(current_positions) != 4:
             return False  # Unit not properly placed
         # If we get here, move was attempted. Check if positions changed.
@@ -811,15 +778,16 @@ def resolve_move_action(
     other_unit = team[new_idx]
 
     # Cannot swap into a 2x2 unit's space (would break it)
-    if other_unit is not None and getattr(other_unit, "size", "1x1") == "2x2":
+    if other_unit is not None and other_unit.size == "2x2":
         return False
 
     # Swap with ally if present, or move to empty square
     team[new_idx] = unit
     team[unit_idx] = other_unit
+    clear_damage_cache(encounter)
 
     if other_unit is not None:
-        other_name = getattr(other_unit, "name", "Unknown")
+        other_name = other_unit.name
         add_combat_log(encounter, f"{unit_name} swaps with {other_name}")
     else:
         add_combat_log(encounter, f"{unit_name} moves")
@@ -845,7 +813,7 @@ def remove_dead_units(
             if id(unit) not in removed_ids:
                 removed.append(unit)
                 removed_ids.add(id(unit))
-                unit_name = getattr(unit, "name", "Unknown")
+                unit_name = unit.name
                 add_combat_log(encounter, f"{unit_name} is defeated!")
 
                 # If a player ally dies, also remove from player's permanent team
@@ -906,6 +874,7 @@ def check_encounter_end(gamestate: GameState) -> bool:
         gamestate.placeables = [
             p for p in gamestate.placeables if p != encounter
         ]
+        gamestate.mark_map_changed()
         gamestate.active_encounter = None
 
         # Boss Win Condition
@@ -937,6 +906,8 @@ def initialize_encounter(encounter: Encounter, player: Player) -> None:
     if encounter.creatures:
         _randomly_place_enemies(encounter.enemy_team, encounter.creatures)
 
+    clear_damage_cache(encounter)
+
     # Determine first turn based on Haste
     encounter.current_turn = "enemy" if check_haste(encounter) else "player"
     encounter.turn_number = 0
@@ -949,8 +920,8 @@ def _randomly_place_enemies(team: list, creatures: list) -> None:
     1x1 units fill remaining spaces.
     """
     # Separate 2x2 and 1x1 units
-    large_units = [u for u in creatures if getattr(u, "size", "1x1") == "2x2"]
-    small_units = [u for u in creatures if getattr(u, "size", "1x1") == "1x1"]
+    large_units = [u for u in creatures if u.size == "2x2"]
+    small_units = [u for u in creatures if u.size == "1x1"]
 
     # Shuffle for randomness
     random.shuffle(large_units)
@@ -994,17 +965,15 @@ def is_2x2_placement_valid(team: list, start_col: int, start_row: int) -> bool:
     2x2 occupies: (col, row), (col+1, row), (col, row+1), (col+1, row+1)
     """
     # Must fit in grid (can't start at col 2 or row 2)
-    if start_col >= 2 or start_row >= 2:
+    indices = TWO_BY_TWO_SQUARES.get((start_col, start_row))
+    if indices is None:
         return False
 
-    # Get the four indices
-    indices = get_2x2_indices(start_col, start_row)
-
     # Check no existing 2x2 unit conflicts
     existing_2x2 = None
     for idx in indices:
         unit = team[idx] if team else None
-        if unit is not None and getattr(unit, "size", "1x1") == "2x2":
+        if unit is not None and unit.size == "2x2":
             if existing_2x2 is None:
                 existing_2x2 = unit
             elif existing_2x2 is not unit:
@@ -1013,6 +982,14 @@ def is_2x2_placement_valid(team: list, start_col: int, start_row: int) -> bool:
     return True
 
 
+# Grid indices (TL, TR, BL, BR) covered by a 2x2 unit, keyed by its valid (col, row) origins
+TWO_BY_TWO_SQUARES: dict[tuple[int, int], tuple[int, int, int, int]] = {
+    (col, row): (row * 3 + col, row * 3 + col + 1, (row + 1) * 3 + col, (row + 1) * 3 + col + 1)
+    for col in range(2)
+    for row in range(2)
+}
+
+
 def get_2x2_indices(start_col: int, start_row: int) -> list[int]:
     """Get the four grid indices for a 2x2 unit placed at (col, row)."""
     return [
@@ -1034,7 +1011,7 @@ def place_2x2_unit(team: list, unit: Creature, start_col: int, start_row: int) -
     for idx in indices:
         existing = team[idx]
         if existing is not None and existing is not unit:
-            if getattr(existing, "size", "1x1") != "2x2":
+            if existing.size != "2x2":
                 displaced.append(existing)
         team[idx] = unit
 
@@ -1047,7 +1024,7 @@ def move_2x2_unit(team: list, unit: Creature, direction: tuple[int, int]) -> lis
     Returns list of displaced units (which move into opened squares).
     """
     # Find current position (top-left corner)
-    current_positions = [i for i, u in enumerate(team) if u is unit]
+    current_positions = get_unit_indices(unit, team)
     if len(current_positions) != 4:
         return []
 
@@ -1094,12 +1071,11 @@ def get_2x2_primary_position(team: list, unit: Creature) -> Optional[tuple[int,
     For ranged/magic targeting, 2x2 units are treated as being at their
     front-top-most square.
     """
-    for idx, u in enumerate(team or []):
-        if u is unit:
-            row, col = idx // 3, idx % 3
-            # Return top-left corner
-            return col, row
-    return None
+    slots = get_unit_indices(unit, team)
+    if not slots:
+        return None
+    # Return top-left corner (slots are ascending)
+    return grid_index_to_coords(slots[0])
 
 
 def generate_map(
@@ -1180,47 +1156,28 @@ def generate_map(
     base_tile = biome_info["base_tile"]
     wall_tile = terrain_tiles["wall"]
 
+    # (symbol, color, bg_color) per tile id, resolved once instead of per cell
+    wall_look = (wall_tile["symbol"], wall_tile["color"], wall_tile["bg_color"])
+    tile_looks = {}
+    for tile_id in set(terrain_map.values()) | {base_tile}:
+        tile_def = terrain_tiles.get(tile_id, terrain_tiles[base_tile])
+        tile_looks[tile_id] = (tile_def["symbol"], tile_def["color"], tile_def["bg_color"])
+
     # Place all terrain including border walls
     for y in range(GRID_HEIGHT):
+        border_row = y == 0 or y == GRID_HEIGHT - 1
         for x in range(GRID_WIDTH):
-            # Border walls (edge of map)
-            if x == 0 or x == GRID_WIDTH - 1 or y == 0 or y == GRID_HEIGHT - 1:
-                placeables.append(
-                    Terrain(
-                        x=x,
-                        y=y,
-                        symbol=wall_tile["symbol"],
-                        color=wall_tile["color"],
-                        bg_color=wall_tile["bg_color"],
-                        tile_type="wall",
-                    )
-                )
-            # Maze walls (between cells)
-            elif (x, y) in wall_positions:
-                placeables.append(
-                    Terrain(
-                        x=x,
-                        y=y,
-                        symbol=wall_tile["symbol"],
-                        color=wall_tile["color"],
-                        bg_color=wall_tile["bg_color"],
-                        tile_type="wall",
-                    )
-                )
+            # Border walls (edge of map) and maze walls (between cells)
+            if border_row or x == 0 or x == GRID_WIDTH - 1 or (x, y) in wall_positions:
+                tile_id = "wall"
+                symbol, color, bg_color = wall_look
             # Regular terrain (cell interiors)
             else:
                 tile_id = terrain_map.get((x, y), base_tile)
-                tile_def = terrain_tiles.get(tile_id, terrain_tiles[base_tile])
-                placeables.append(
-                    Terrain(
-                        x=x,
-                        y=y,
-                        symbol=tile_def["symbol"],
-                        color=tile_def["color"],
-                        bg_color=tile_def["bg_color"],
-                        tile_type=tile_id,
-                    )
-                )
+                symbol, color, bg_color = tile_looks[tile_id]
+            placeables.append(
+                Terrain(x=x, y=y, symbol=symbol, color=color, bg_color=bg_color, tile_type=tile_id)
+            )
 
     # Level Specific Generation
     if stage == 20:
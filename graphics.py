@@ -1,12 +1,25 @@
-import os
 import pygame
 import pygame.freetype
-from typing import Dict, Optional, Tuple
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
 
 from game_data import LEFT_PANEL_WIDTH
 
-# Default BDF font path (relative to this file)
-DEFAULT_FONT_PATH = os.path.join(os.path.dirname(__file__), "ucs-fonts", "10x20.bdf")
+# Default BDF font path (next to this file), resolved once so it is a stable cache key
+DEFAULT_FONT_PATH = str(Path(__file__).resolve().parent / "ucs-fonts" / "10x20.bdf")
+
+
+@lru_cache(maxsize=None)
+def get_tile_size(font_path: str = DEFAULT_FONT_PATH, scale: int = 1) -> Tuple[int, int]:
+    """
+    Returns the (width, height) in pixels of one scaled tile of the given font.
+    Measured once per font and scale; the result is plain ints, so it outlives pygame re-inits.
+    """
+    pygame.freetype.init()
+    # BDF fonts have fixed size - get it from a rendered character
+    surf, rect = pygame.freetype.Font(font_path).render("█", (255, 255, 255))
+    return surf.get_width() * scale, surf.get_height() * scale
 
 
 class SpriteManager:
@@ -14,10 +27,7 @@ class SpriteManager:
         self.scale = scale
         pygame.freetype.init()
         self.font = pygame.freetype.Font(font_path)
-        # BDF fonts have fixed size - get it from a rendered character
-        surf, rect = self.font.render("█", (255, 255, 255))
-        self.tile_width = surf.get_width() * scale
-        self.tile_height = surf.get_height() * scale
+        self.tile_width, self.tile_height = get_tile_size(font_path, scale)
         self.cache: Dict[
             Tuple[str, Tuple[int, int, int], Optional[Tuple[int, int, int]]],
             pygame.Surface,
@@ -63,3 +73,28 @@ class SpriteManager:
         screen_x = (x + LEFT_PANEL_WIDTH) * self.tile_width
         screen_y = y * self.tile_height
         screen.blit(sprite, (screen_x, screen_y))
+
+    def draw_many(
+        self,
+        screen: pygame.Surface,
+        cells: Iterable[
+            Tuple[int, int, str, Tuple[int, int, int], Optional[Tuple[int, int, int]]]
+        ],
+    ):
+        """
+        Draws (x, y, symbol, color, bg_color) cells in order with a single blit batch.
+        Offsets by LEFT_PANEL_WIDTH like draw().
+        """
+        tile_width = self.tile_width
+        tile_height = self.tile_height
+        get_sprite = self.get_sprite
+        screen.blits(
+            [
+                (
+                    get_sprite(symbol, color, bg_color),
+                    ((x + LEFT_PANEL_WIDTH) * tile_width, y * tile_height),
+                )
+                for x, y, symbol, color, bg_color in cells
+            ],
+            doreturn=False,
+        )
@@ -3,7 +3,7 @@ from abc import ABC, abstractmethod
 from typing import TYPE_CHECKING, Optional, Union
 from enum import Enum
 
-from game_data import GRID_HEIGHT, GRID_WIDTH, LEFT_PANEL_WIDTH, Player, Creature, Terrain
+from game_data import GRID_HEIGHT, GRID_WIDTH, LEFT_PANEL_WIDTH, AttackKind, Player, Creature, Terrain
 from gameplay import advance_step, select_best_attack, calculate_expected_result, BIOME_DATA
 from combat import get_hero_attacks, calculate_hero_combat_stats
 
@@ -14,6 +14,9 @@ if TYPE_CHECKING:
 ENCOUNTER_GRID_WIDTH = 3
 ENCOUNTER_GRID_HEIGHT = 3
 
+# Rendered text surfaces kept per screen before its cache is reset
+TEXT_SURFACE_CACHE_SIZE = 512
+
 class EncounterMode(Enum):
     """Enum for encounter screen modes."""
     NORMAL = "normal"
@@ -28,6 +31,12 @@ class EncounterMode(Enum):
 class Screen(ABC):
     """Base class for screens in the game."""
 
+    # Left panel pieces built on first draw and reused every frame
+    _panel_background: Optional[pygame.Surface] = None
+    _panel_fonts: Optional[tuple[pygame.font.Font, pygame.font.Font, pygame.font.Font]] = None
+    # (text, color, font) -> rendered surface, so unchanged text is not re-rendered each frame
+    _text_surfaces: Optional[dict[tuple, pygame.Surface]] = None
+
     def handle_event(self, event: pygame.event.Event, game: "game_module.Game") -> None:
         """Handle an input event."""
         if event.type == pygame.QUIT:
@@ -58,7 +67,19 @@ class Screen(ABC):
         pass
 
     def draw_text(self, screen: pygame.Surface, text: str, x: int, y: int, color: tuple[int, int, int], font: pygame.font.Font, centered: bool = False):
-        surface = font.render(text, True, color)
+        cache = self._text_surfaces
+        if cache is None:
+            cache = self._text_surfaces = {}
+        key = (text, color, font)
+        surface = cache.get(key)
+        if surface is None:
+            if len(cache) >= TEXT_SURFACE_CACHE_SIZE:
+                cache.clear()
+            surface = cache[key] = font.render(text, True, color)
+        self.draw_label(screen, surface, x, y, centered)
+
+    def draw_label(self, screen: pygame.Surface, surface: pygame.Surface, x: int, y: int, centered: bool = False):
+        """Blit an already rendered text surface, positioned like draw_text."""
         rect = surface.get_rect()
         if centered:
             rect.center = (x, y)
@@ -73,10 +94,15 @@ class Screen(ABC):
     def draw_left_panel(self, screen: pygame.Surface, game: "game_module.Game") -> None:
         """Draw the left panel background with a border."""
         panel_width = self.get_panel_width_pixels(game)
-        # Dark panel background
-        pygame.draw.rect(screen, (20, 20, 30), (0, 0, panel_width, screen.get_height()))
-        # Border line
-        pygame.draw.line(screen, (60, 60, 80), (panel_width - 1, 0), (panel_width - 1, screen.get_height()))
+        size = (panel_width, screen.get_height())
+        background = self._panel_background
+        if background is None or background.get_size() != size:
+            background = self._panel_background = pygame.Surface(size)
+            # Dark panel background
+            background.fill((20, 20, 30))
+            # Border line
+            pygame.draw.line(background, (60, 60, 80), (panel_width - 1, 0), (panel_width - 1, size[1]))
+        screen.blit(background, (0, 0))
 
     def draw_left_panel_content(self, screen: pygame.Surface, game: "game_module.Game") -> None:
         """Draw the full left panel UI with player info, team, stats, and biome."""
@@ -90,9 +116,13 @@ class Screen(ABC):
             return
 
         # Fonts
-        header_font = pygame.font.SysFont("monospace", 14, bold=True)
-        normal_font = pygame.font.SysFont("monospace", 13)
-        small_font = pygame.font.SysFont("monospace", 11)
+        if self._panel_fonts is None:
+            self._panel_fonts = (
+                pygame.font.SysFont("monospace", 14, bold=True),
+                pygame.font.SysFont("monospace", 13),
+                pygame.font.SysFont("monospace", 11),
+            )
+        header_font, normal_font, small_font = self._panel_fonts
 
         y = 10
 
@@ -836,6 +866,16 @@ class MainMenu(Screen):
         self.selected_index = 0
         self.font = pygame.font.SysFont("monospace", 22, bold=True)
         self.small_font = pygame.font.SysFont("monospace", 14)
+        # The menu text never changes, so every label is rendered once here
+        self.title_label = self.font.render("MAIN MENU", True, (255, 255, 0))
+        self.option_labels = [self.font.render(option, True, (200, 200, 200)) for option in self.options]
+        self.selected_option_labels = [
+            self.font.render(f"> {option} <", True, (0, 255, 0)) for option in self.options
+        ]
+        self.instruction_labels = [
+            self.small_font.render(text, True, (150, 150, 150))
+            for text in ("Use UP/DOWN or numpad 8/2 to navigate.", "ENTER to select. ESC to quit.")
+        ]
 
     def handle_specific_event(self, event: pygame.event.Event, game: "game_module.Game") -> bool:
         if event.type == pygame.KEYDOWN:
@@ -866,23 +906,20 @@ class MainMenu(Screen):
         screen.fill((0, 0, 0))
 
         # Draw Title (no left panel on main menu)
-        title = "MAIN MENU"
         center_x = screen.get_width() // 2
-        self.draw_text(screen, title, center_x, screen.get_height() // 4, (255, 255, 0), self.font, centered=True)
+        self.draw_label(screen, self.title_label, center_x, screen.get_height() // 4, centered=True)
 
         # Draw Options
         start_y = screen.get_height() // 2
-        for i, option in enumerate(self.options):
-            y = start_y + i * 40
-            color = (0, 255, 0) if i == self.selected_index else (200, 200, 200)
-            text = f"> {option} <" if i == self.selected_index else option
-            self.draw_text(screen, text, center_x, y, color, self.font, centered=True)
+        for i, label in enumerate(self.option_labels):
+            if i == self.selected_index:
+                label = self.selected_option_labels[i]
+            self.draw_label(screen, label, center_x, start_y + i * 40, centered=True)
 
         # Draw Instructions
-        instr1 = "Use UP/DOWN or numpad 8/2 to navigate."
-        instr2 = "ENTER to select. ESC to quit."
-        self.draw_text(screen, instr1, center_x, screen.get_height() - 60, (150, 150, 150), self.small_font, centered=True)
-        self.draw_text(screen, instr2, center_x, screen.get_height() - 30, (150, 150, 150), self.small_font, centered=True)
+        instr1, instr2 = self.instruction_labels
+        self.draw_label(screen, instr1, center_x, screen.get_height() - 60, centered=True)
+        self.draw_label(screen, instr2, center_x, screen.get_height() - 30, centered=True)
 
 
 class WinScreen(Screen):
@@ -963,7 +1000,7 @@ class BattleResultsScreen(Screen):
         lines += len(self.battle_results.get("participants", [])) * 2
         lines += 2  # Tier ups header
         for tier_up in self.battle_results.get("tier_ups", []):
-            lines += 2 + len(tier_up.get("bonuses", []))
+            lines += 2 + len(tier_up.bonuses)
         lines += 2  # Recruits header
         lines += len(self.recruits) * 2
 
@@ -1037,12 +1074,9 @@ class BattleResultsScreen(Screen):
         else:
             for p in participants:
                 if y > 0 and y < content_max_y:
-                    name = p["name"]
-                    before = p["battles_before"]
-                    after = p["battles_after"]
                     self.draw_text(
                         screen,
-                        f"  {name}: {before} -> {after} battles (+1)",
+                        f"  {p.name}: {p.battles_before} -> {p.battles_after} battles (+1)",
                         left_margin, y, (200, 200, 200), self.small_font
                     )
                 y += 20
@@ -1061,20 +1095,15 @@ class BattleResultsScreen(Screen):
             y += 22
         else:
             for tier_up in tier_ups:
-                name = tier_up["name"]
-                old_tier = tier_up["old_tier"]
-                new_tier = tier_up["new_tier"]
-                bonuses = tier_up.get("bonuses", [])
-
                 if y > 0 and y < content_max_y:
                     self.draw_text(
                         screen,
-                        f"  {name}: Tier {old_tier} -> Tier {new_tier}!",
+                        f"  {tier_up.name}: Tier {tier_up.old_tier} -> Tier {tier_up.new_tier}!",
                         left_margin, y, (255, 255, 100), self.small_font
                     )
                 y += 20
 
-                for bonus in bonuses:
+                for bonus in tier_up.bonuses:
                     if y > 0 and y < content_max_y:
                         self.draw_text(
                             screen,
@@ -1334,6 +1363,9 @@ class MapView(Screen):
         self.auto_walk_dir = None  # (dx, dy) or None
         self.last_walk_time = 0
         self.walk_delay_ms = 50  # Milliseconds between auto-walk steps
+        # Pre-rendered terrain for the current floor and what it was built from
+        self.terrain_layer = None
+        self.terrain_key = None  # (map version, screen size, sprite manager)
 
     def handle_specific_event(self, event: pygame.event.Event, game: "game_module.Game") -> bool:
         if event.type == pygame.KEYDOWN:
@@ -1410,6 +1442,7 @@ class MapView(Screen):
             return
         dx, dy = self.auto_walk_dir
         should_stop = self._do_move(game, dx, dy)
+        game.needs_redraw = True
         if should_stop:
             self.auto_walk_dir = None
 
@@ -1423,36 +1456,45 @@ class MapView(Screen):
             self.last_walk_time = current_time
             self._do_walk_step(game)
 
+    def _get_terrain_layer(self, screen: pygame.Surface, game: "game_module.Game") -> pygame.Surface:
+        """Get the floor's terrain drawn on a black screen-sized surface.
+
+        Rebuilt only when the gamestate's map_version changes (see GameState.mark_map_changed).
+        """
+        key = (game.gamestate.map_version, screen.get_size(), game.sprite_manager)
+        if self.terrain_key != key:
+            layer = pygame.Surface(screen.get_size())
+            layer.fill((0, 0, 0))
+            game.sprite_manager.draw_many(layer, [
+                (p.x, p.y, p.symbol, p.color, p.bg_color)
+                for p in game.gamestate.placeables or []
+                if p.visible and isinstance(p, Terrain)
+            ])
+            self.terrain_layer = layer
+            self.terrain_key = key
+        return self.terrain_layer
+
     def render(self, screen: pygame.Surface, game: "game_module.Game") -> None:
-        screen.fill((0, 0, 0))
+        # Static terrain comes from the cached layer, which also clears the screen
+        placeables = game.gamestate.placeables or []
+        screen.blit(self._get_terrain_layer(screen, game), (0, 0))
 
         # Draw left panel
         self.draw_left_panel(screen, game)
         self.draw_left_panel_content(screen, game)
 
-        # Draw all visible placeables except player first
-        for placeable in game.gamestate.placeables or []:
-            if placeable.visible and not isinstance(placeable, Player):
-                game.sprite_manager.draw(
-                    screen,
-                    placeable.x,
-                    placeable.y,
-                    placeable.symbol,
-                    placeable.color,
-                    placeable.bg_color,
-                )
-
-        # Draw player
-        for placeable in game.gamestate.placeables or []:
-            if isinstance(placeable, Player):
-                game.sprite_manager.draw(
-                    screen,
-                    placeable.x,
-                    placeable.y,
-                    placeable.symbol,
-                    placeable.color,
-                    placeable.bg_color,
-                )
+        # Draw other visible placeables, then the player, in one blit batch
+        cells = [
+            (p.x, p.y, p.symbol, p.color, p.bg_color)
+            for p in placeables
+            if p.visible and not isinstance(p, (Player, Terrain))
+        ]
+        cells += [
+            (p.x, p.y, p.symbol, p.color, p.bg_color)
+            for p in placeables
+            if isinstance(p, Player)
+        ]
+        game.sprite_manager.draw_many(screen, cells)
 
         # Show walk mode indicator at bottom of left panel
         walk_y = screen.get_height() - 50
@@ -1515,6 +1557,14 @@ class EncounterScreen(Screen):
             pygame.K_j: (0, 1), pygame.K_k: (1, 1), pygame.K_l: (2, 1),
             pygame.K_m: (0, 2), pygame.K_COMMA: (1, 2), pygame.K_PERIOD: (2, 2),
         }
+        # Normal-mode keys that switch to another mode
+        self.mode_key_map = {
+            pygame.K_a: EncounterMode.ATTACK,
+            pygame.K_c: EncounterMode.CONVERT,
+            pygame.K_v: EncounterMode.SELECTING_MOVE_SOURCE,
+            pygame.K_q: EncounterMode.SELECTING_ALLY,
+            pygame.K_e: EncounterMode.SELECTING_ENEMY,
+        }
 
     def handle_specific_event(self, event: pygame.event.Event, game: "game_module.Game") -> bool:
         if event.type == pygame.KEYDOWN:
@@ -1601,20 +1651,8 @@ class EncounterScreen(Screen):
                     return True
 
             else: # Normal Mode
-                if event.key == pygame.K_a:
-                    self.mode = EncounterMode.ATTACK
-                    return True
-                elif event.key == pygame.K_c:
-                    self.mode = EncounterMode.CONVERT
-                    return True
-                elif event.key == pygame.K_v:
-                    self.mode = EncounterMode.SELECTING_MOVE_SOURCE
-                    return True
-                elif event.key == pygame.K_q:
-                    self.mode = EncounterMode.SELECTING_ALLY
-                    return True
-                elif event.key == pygame.K_e:
-                    self.mode = EncounterMode.SELECTING_ENEMY
+                if event.key in self.mode_key_map:
+                    self.mode = self.mode_key_map[event.key]
                     return True
                 elif event.key == pygame.K_f:
                     game.gamestate.active_encounter = None
@@ -1861,7 +1899,7 @@ class EncounterScreen(Screen):
             if isinstance(unit, Player):
                 attacks = get_hero_attacks(unit)
             else:
-                attacks = unit.attacks or []
+                attacks = unit.attacks
 
             if not attacks:
                 continue
@@ -1870,7 +1908,7 @@ class EncounterScreen(Screen):
             for attack in attacks:
                 can_hit = False
 
-                if attack.attack_type == "ranged":
+                if attack.attack_type is AttackKind.RANGED:
                     # Ranged can hit squares within range
                     # Distance is column-based: attacker is in player grid (0-2), target is in enemy grid (0-2)
                     # Distance = (3 - attacker_col) + target_col (crossing the gap between grids)
@@ -1879,13 +1917,13 @@ class EncounterScreen(Screen):
                     range_max = attack.range_max or 99
                     can_hit = (range_min <= distance <= range_max)
 
-                elif attack.attack_type == "magic":
+                elif attack.attack_type is AttackKind.MAGIC:
                     # Magic hits mirror column (front->front, middle->middle, back->back)
                     # Mirror column: player col 0 (back) hits enemy col 2 (back), etc.
                     mirror_col = 2 - attacker_col
                     can_hit = (target_col == mirror_col)
 
-                elif attack.attack_type == "melee":
+                elif attack.attack_type is AttackKind.MELEE:
                     # Melee can only hit if on same row, target is first enemy,
                     # and no ally is blocking (in front of attacker)
                     if attacker_row == target_row:
@@ -7,7 +7,7 @@ from typing import Dict, List, Set, Tuple
 import tcod.noise
 
 
-@dataclass
+@dataclass(slots=True)
 class MazeCell:
     """Represents a cell in a maze with walls on each edge."""
 
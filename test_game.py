@@ -23,18 +23,36 @@ from game import Game
 from game_data import (
     GRID_HEIGHT,
     GRID_WIDTH,
+    GUARDIAN,
+    PACK_HUNTER,
     Attack,
+    AttackKind,
     Creature,
     Encounter,
     GameState,
     Player,
     Terrain,
 )
-from gameplay import advance_step, generate_map
+from gameplay import advance_step, check_encounter_end, generate_map, resolve_move_action
 from terrain_gen import MazeCell, generate_maze
 from pygame_screens import EncounterScreen, EncounterStartScreen, MainMenu, MapView, EncounterMode
 from creatures import spawn_creature
 from experience import get_base_battles_for_tier, get_battles_for_tier, check_tier_upgrade, get_max_tier
+from combat import calculate_damage, get_ability_value, get_hero_attacks, has_ability
+from abilities import (
+    calculate_guardian_bonus,
+    calculate_protector_bonus,
+    calculate_shield_wall_bonus,
+    calculate_team_defense_bonuses,
+    check_flying,
+    clear_debuff_stacks,
+    count_same_type,
+    get_healing_amount,
+    get_team_view,
+    get_unit_indices,
+    has_splash,
+)
+from ai import calculate_potential_damage, clear_damage_cache, get_damage_grid
 
 
 def get_player(gamestate: GameState) -> Player:
@@ -148,6 +166,27 @@ class TestPlayer:
         assert player.x == start_x  # Should not have moved
         assert player.y == start_y
 
+    def test_hero_attacks_follow_stats(self):
+        """Test that hero attacks are rebuilt from the current stats."""
+        player = Player(0, 0)
+        attacks = get_hero_attacks(player)
+        assert isinstance(attacks, list)
+
+        player.wisdom += 20
+        upgraded = get_hero_attacks(player)
+        assert upgraded[0].damage > attacks[0].damage
+        assert upgraded[1].damage == attacks[1].damage
+
+    def test_hero_attacks_are_not_shared(self):
+        """Test that changing one hero's attacks does not leak into other calls."""
+        attacks = get_hero_attacks(Player(0, 0))
+        attacks[0].damage += 10
+        attacks.pop()
+
+        other = get_hero_attacks(Player(5, 5))
+        assert len(other) == 3
+        assert other[0].damage == attacks[0].damage - 10
+
 
 class TestGame:
     """Tests for the Game class."""
@@ -241,6 +280,59 @@ class TestMapView:
         # Should not raise an exception
         map_view.render(surface, game)
 
+    def test_mapview_terrain_layer_rebuilt_when_map_changes(self):
+        """Test that the cached terrain layer is reused until the map is marked changed."""
+        map_view = MapView()
+        game = create_test_game()
+        surface = pygame.Surface((800, 600))
+
+        map_view.render(surface, game)
+        layer = map_view.terrain_layer
+        map_view.render(surface, game)
+        assert map_view.terrain_layer is layer
+
+        # Edit the tile next to the player in place
+        player = get_player(game.gamestate)
+        terrain = next(
+            p for p in game.gamestate.placeables
+            if isinstance(p, Terrain) and (p.x, p.y) == (player.x + 1, player.y)
+        )
+        terrain.symbol, terrain.color, terrain.bg_color = "#", (255, 0, 255), (0, 255, 0)
+        game.gamestate.mark_map_changed()
+        map_view.render(surface, game)
+        assert map_view.terrain_layer is not layer
+
+        # The frame matches a render with no cached layer
+        fresh = pygame.Surface((800, 600))
+        MapView().render(fresh, game)
+        assert pygame.image.tobytes(surface, "RGB") == pygame.image.tobytes(fresh, "RGB")
+
+    def test_mapview_terrain_layer_rebuilt_for_new_gamestate(self):
+        """Test that a new floor never reuses the previous floor's terrain layer."""
+        map_view = MapView()
+        game = create_test_game()
+        surface = pygame.Surface((800, 600))
+
+        map_view.render(surface, game)
+        layer = map_view.terrain_layer
+        game.gamestate = GameState(placeables=list(game.gamestate.placeables), active_encounter=None)
+        map_view.render(surface, game)
+        assert map_view.terrain_layer is not layer
+
+    def test_encounter_removal_marks_map_changed(self):
+        """Test that removing a won encounter from the map bumps the map version."""
+        player = Player(10, 10)
+        encounter = Encounter(11, 10, symbol="E", color=(255, 0, 0))
+        encounter.player_team = [None] * 9
+        encounter.player_team[4] = player
+        encounter.enemy_team = [None] * 9
+        gamestate = GameState(placeables=[player, encounter], active_encounter=encounter)
+        version = gamestate.map_version
+
+        assert check_encounter_end(gamestate)
+        assert encounter not in gamestate.placeables
+        assert gamestate.map_version != version
+
 
 class TestMainMenu:
     """Tests for the MainMenu screen class."""
@@ -413,6 +505,18 @@ class TestSerialization:
         assert deserialized_player.y == original_player.y
         assert deserialized_player.symbol == original_player.symbol
 
+    def test_attack_json_roundtrip(self):
+        """Test that an Attack's type survives JSON (written as an int) as an AttackKind."""
+        original = Attack(attack_type="ranged", damage=4, range_min=2, range_max=3, abilities=["Piercing"])
+
+        parsed = json.loads(json.dumps(asdict(original)))
+        del parsed["ability_flags"]  # Derived, not an init field
+        deserialized = Attack(**parsed)
+
+        assert deserialized.attack_type is AttackKind.RANGED
+        assert deserialized == original
+        assert deserialized.ability_flags == original.ability_flags
+
 
 class TestAdvanceStep:
     """Tests for the advance_step function."""
@@ -732,7 +836,7 @@ class TestNewGameFlow:
 
 
 class TestAttackAction:
-    """Tests for the attack action."""
+    """Tests for the attack action and the damage and ability math behind it."""
 
     def test_attack_reduces_creature_health(self):
         """Test that attack action reduces creature health."""
@@ -926,6 +1030,203 @@ class TestAttackAction:
         assert player.creatures[3] is None, "Dead 2x2 ally should be removed from player.creatures pos 3"
         assert player.creatures[4] is None, "Dead 2x2 ally should be removed from player.creatures pos 4"
 
+    def test_clear_debuff_stacks_updates_dict_in_place(self):
+        """Test that attacking removes one stack of each debuff from the unit's own dict."""
+        unit = create_test_creature()
+        debuffs = unit.debuffs
+        debuffs.update({"weakened": 2, "blinded": 1})
+
+        assert clear_debuff_stacks(unit) == ["weakened", "blinded"]
+        assert unit.debuffs is debuffs
+        assert debuffs == {"weakened": 1}
+
+    def test_string_attack_types_are_converted(self):
+        """Test that string attack types become AttackKind members that still display as names."""
+        attack = Attack(attack_type="ranged", damage=4, range_min=1, range_max=2)
+        assert attack.attack_type is AttackKind.RANGED
+        assert f"{attack.attack_type}: {attack.damage}" == "ranged: 4"
+        assert Attack(attack_type=AttackKind.MAGIC, damage=1).attack_type is AttackKind.MAGIC
+
+    def test_damage_override_replaces_attack_damage(self):
+        """Test that calculate_damage uses damage_override instead of attack.damage."""
+        attack = Attack(attack_type="melee", damage=5)
+        attacker = create_test_creature()
+        defender = create_test_creature(defense=2)
+        assert calculate_damage(attack, attacker, defender) == 3
+        assert calculate_damage(attack, attacker, defender, damage_override=9) == 7
+        assert calculate_damage(attack, attacker, defender, {"weakened": 1}, damage_override=9) == 4
+        assert attack.damage == 5
+
+    def test_damage_uses_attack_type_defense_stat(self):
+        """Test that each attack type is reduced by its own stat, for creatures and heroes."""
+        attacker = create_test_creature()
+        defender = create_test_creature(defense=1, dodge=2, resistance=3)
+        hero = Player(0, 0, base_defense=1, base_dodge=2, base_resistance=3)
+        for attack_type, expected in (("melee", 9), ("ranged", 8), ("magic", 7)):
+            attack = Attack(attack_type=attack_type, damage=10)
+            assert calculate_damage(attack, attacker, defender) == expected
+            assert calculate_damage(attack, attacker, hero) == expected
+        assert calculate_damage(Attack(attack_type="melee", damage=10), attacker, defender,
+                                defender_has_flying=True) == 0
+
+    def test_flags_follow_ability_lists(self):
+        """Test that creature and attack flags reflect their ability strings."""
+        owl = spawn_creature("Frost Owl")
+        assert get_healing_amount(owl) == 3
+        assert not check_flying(owl)
+        assert check_flying(spawn_creature("Eagle"))
+        assert has_splash(spawn_creature("Dwarf").attacks[1])
+
+    def test_ability_index_lookups(self):
+        """Test has_ability/get_ability_value against the precomputed ability index."""
+        unit = create_test_creature(abilities=["Evasion 25%", "Shield Wall"])
+        assert has_ability(unit, "Evasion")
+        assert has_ability(unit, "Shield Wall")
+        assert not has_ability(unit, "Wall")
+        assert get_ability_value(unit, "Evasion") == 25
+        assert get_ability_value(unit, "Shield Wall") is None
+        assert not has_ability(Player(0, 0), "Evasion")
+        assert get_ability_value(Player(0, 0), "Evasion") is None
+
+    def test_get_ability_value_accepts_partial_prefix(self):
+        """Test that get_ability_value still matches plain string prefixes by keyword."""
+        unit = create_test_creature(abilities=["Flying", "Evasion 25%"])
+        assert get_ability_value(unit, ability_prefix="Evas") == 25
+        assert get_ability_value(unit, ability_prefix="Fly") is None
+
+    def test_count_tracks_team_changes(self):
+        """Test that same-type counts follow direct team mutations."""
+        wolves = [create_test_creature(name="Wolf") for _ in range(3)]
+        team = [wolves[0], wolves[1], None, None, None, None, None, None, None]
+        assert count_same_type(wolves[0], team) == 1
+        team[2] = wolves[2]
+        assert count_same_type(wolves[0], team) == 2
+        team[1] = None
+        assert count_same_type(wolves[0], team) == 1
+        assert count_same_type(create_test_creature(name="Wolf"), team) == 2
+
+    def test_unit_indices_for_2x2_unit(self):
+        """Test that a 2x2 unit's slots are found and excluded from its own count."""
+        big = create_test_creature(name="Bear")
+        small = create_test_creature(name="Bear")
+        team = [big, big, None, big, big, None, None, None, small]
+        assert get_unit_indices(big, team) == (0, 1, 3, 4)
+        assert get_unit_indices(small, team) == (8,)
+        assert get_unit_indices(create_test_creature(), team) == ()
+        assert count_same_type(big, team) == 1
+        assert count_same_type(small, team) == 4
+
+    def test_fused_bonuses_match_individual_bonuses(self):
+        """Test that the single-pass bonuses equal the per-ability functions."""
+        guardian = create_test_creature(name="Knight", defense=6, dodge=4, resistance=8,
+                                        abilities=["Guardian", "Protector"])
+        unit = create_test_creature(name="Wall", defense=10, dodge=6, abilities=["Shield Wall"])
+        other = create_test_creature(name="Wall", defense=10, dodge=6, abilities=["Shield Wall"])
+        encounter = Encounter(x=0, y=0, symbol="#", color=(255, 255, 255))
+        encounter.player_team = [None, guardian, None, None, unit, other, None, None, None]
+
+        guardian_bonus = calculate_guardian_bonus(unit, encounter, True)
+        shield_wall_bonus = calculate_shield_wall_bonus(unit, encounter, True)
+        expected = (
+            guardian_bonus["defense"] + shield_wall_bonus["defense"],
+            guardian_bonus["dodge"] + shield_wall_bonus["dodge"],
+            calculate_protector_bonus(unit, encounter, True),
+        )
+        assert expected == (3 + 5, 2 + 3, 4)
+        assert calculate_team_defense_bonuses(unit, encounter, True) == expected
+
+    def test_team_view_reflects_stat_changes(self):
+        """Test that team views pick up tier-ups and direct stat writes."""
+        pikeman = spawn_creature("Goblin Pikeman")
+        team = [pikeman] + [None] * 8
+        assert get_team_view(team).defense[0] == 3
+        pikeman.set_tier(2)
+        view = get_team_view(team)
+        assert view.defense[0] == 4
+        assert view.ability_flags[0] == pikeman.ability_flags
+
+        pikeman.defense = 9
+        pikeman.abilities.append("Guardian")
+        pikeman.refresh_ability_cache()
+        view = get_team_view(team)
+        assert view.defense[0] == 9
+        assert view.team_flags & GUARDIAN
+
+    def test_damage_grid_matches_potential_damage(self):
+        """Test that the cached grid matches per-square damage calculations."""
+        player = Player(10, 10)
+        wolf = create_test_creature(name="Wolf", attacks=[Attack(attack_type="melee", damage=6)])
+        encounter = Encounter(10, 10, symbol="#", color=(255, 255, 255), creatures=[wolf])
+        encounter.player_team = [None] * 9
+        encounter.player_team[4] = player
+        setup_enemy_at_position(encounter, wolf, 3)
+
+        grid = get_damage_grid(encounter)
+        assert grid == [calculate_potential_damage(encounter, i % 3, i // 3) for i in range(9)]
+        assert grid[4] > 0
+
+    def test_damage_grid_cached_until_cleared(self):
+        """Test that the grid is reused until clear_damage_cache, then reflects direct edits."""
+        player = Player(10, 10)
+        ally = create_test_creature(name="Ally", defense=1)
+        wolf = create_test_creature(name="Wolf", attacks=[Attack(attack_type="melee", damage=6)])
+        encounter = Encounter(10, 10, symbol="#", color=(255, 255, 255), creatures=[wolf])
+        encounter.player_team = [None] * 9
+        encounter.player_team[4] = ally
+        encounter.player_team[0] = player
+        setup_enemy_at_position(encounter, wolf, 3)
+
+        before = get_damage_grid(encounter)[4]
+        ally.defense += 3
+        wolf.debuffs["weakened"] = 1
+        assert get_damage_grid(encounter)[4] == before
+
+        clear_damage_cache(encounter)
+        assert get_damage_grid(encounter)[4] < before - 3
+
+    def test_damage_grid_refreshes_after_move(self):
+        """Test that moving a unit invalidates the grid."""
+        player = Player(10, 10)
+        wolf = create_test_creature(name="Wolf", attacks=[Attack(attack_type="melee", damage=6)])
+        encounter = Encounter(10, 10, symbol="#", color=(255, 255, 255), creatures=[wolf])
+        encounter.player_team = [None] * 9
+        encounter.player_team[4] = player
+        setup_enemy_at_position(encounter, wolf, 3)
+
+        assert get_damage_grid(encounter)[4] > 0
+        assert resolve_move_action(encounter, 4, (-1, 0), is_player=True)
+        assert get_damage_grid(encounter)[4] == 0
+        assert get_damage_grid(encounter)[3] > 0
+
+    def test_damage_grid_is_per_encounter(self):
+        """Test that each encounter keeps its own grid."""
+        grids = []
+        for damage in (4, 8):
+            wolf = create_test_creature(name="Wolf", attacks=[Attack(attack_type="melee", damage=damage)])
+            encounter = Encounter(10, 10, symbol="#", color=(255, 255, 255), creatures=[wolf])
+            encounter.player_team = [None] * 9
+            encounter.player_team[4] = Player(10, 10)
+            setup_enemy_at_position(encounter, wolf, 3)
+            grids.append(get_damage_grid(encounter)[4])
+        assert grids[1] == grids[0] + 4
+
+    def test_potential_damage_reflects_direct_stat_writes(self):
+        """Test that potential damage follows direct edits to defense, attacks and debuffs."""
+        ally = create_test_creature(name="Ally", defense=1)
+        wolf = create_test_creature(name="Wolf", attacks=[Attack(attack_type="melee", damage=6)])
+        encounter = Encounter(10, 10, symbol="#", color=(255, 255, 255), creatures=[wolf])
+        encounter.player_team = [None] * 9
+        encounter.player_team[4] = ally
+        setup_enemy_at_position(encounter, wolf, 3)
+        assert calculate_potential_damage(encounter, 1, 1) == 5
+
+        ally.defense = 3
+        assert calculate_potential_damage(encounter, 1, 1) == 3
+        wolf.attacks[0].damage = 10
+        assert calculate_potential_damage(encounter, 1, 1) == 7
+        wolf.debuffs["weakened"] = 1
+        assert calculate_potential_damage(encounter, 1, 1) < 7
+
 
 class TestConvertAction:
     """Tests for the convert action."""
@@ -1465,3 +1766,89 @@ class TestTierProgression:
         upgraded = check_tier_upgrade(lion, hero_int=15)
         assert upgraded
         assert lion.tier == 3
+
+    def test_tier_bonus_lookup_follows_reassigned_bonuses(self):
+        """Test that tier lookups see reassigned tier_bonuses and every bonus for a tier."""
+        unit = create_test_creature(defense=1)
+        assert get_base_battles_for_tier(unit, 1) is None
+
+        unit.tier_bonuses = [
+            {"tier": 1, "battles": 4, "defense": 1},
+            {"tier": 1, "dodge": 2},
+            {"tier": 2, "battles": 8},
+        ]
+        assert get_base_battles_for_tier(unit, 1) == 4
+        assert get_max_tier(unit) == 2
+
+        unit.apply_tier_bonus(1)
+        assert unit.defense == 2
+        assert unit.dodge == 2
+
+        # Bonuses appended to the list after a lookup are still seen
+        unit.tier_bonuses.append({"tier": 3, "battles": 12})
+        assert get_max_tier(unit) == 3
+        assert get_base_battles_for_tier(unit, 3) == 12
+
+    def test_tier_up_does_not_change_later_spawns(self):
+        """Test that tiering up a spawned creature leaves the registry template untouched."""
+        lion = spawn_creature('Lion')
+        lion.set_tier(3)
+        lion.debuffs["weakened"] = 1
+
+        fresh = spawn_creature('Lion')
+        assert fresh.tier == 0
+        assert fresh.debuffs == {}
+        assert fresh.abilities == []
+        assert fresh.attacks[0].damage == lion.attacks[0].damage - 4
+
+    def test_spawned_tier_bonuses_are_read_only(self):
+        """Test that the tier bonuses a spawn shares with its template cannot be edited in place."""
+        lion = spawn_creature('Lion')
+        with pytest.raises(TypeError):
+            lion.tier_bonuses[0]["defense"] = 99
+        with pytest.raises(TypeError):
+            lion.tier_bonuses[0]["battles"] += 1
+        assert spawn_creature('Lion').tier_bonuses[0] == lion.tier_bonuses[0]
+
+    def test_flags_refresh_after_tier_bonus(self):
+        """Test that tier bonuses refresh creature and attack flags."""
+        wolf = spawn_creature("Wolf")
+        assert not wolf.ability_flags & PACK_HUNTER
+        wolf.set_tier(1)
+        assert wolf.ability_flags & PACK_HUNTER
+
+        owl = spawn_creature("Frost Owl")
+        owl.set_tier(1)
+        assert get_healing_amount(owl) == 4
+
+    def test_evasion_percent_parsed_on_tier_up(self):
+        """Test that Evasion gained from a tier bonus is parsed into evasion_pct."""
+        eagle = spawn_creature("Eagle")
+        assert eagle.evasion_pct == 0
+        eagle.set_tier(1)
+        assert eagle.evasion_pct == 50
+
+    def test_healing_bonus_after_unlock_in_same_tier(self):
+        """Test that a healing bonus applies to Healing unlocked by the same tier."""
+        unit = create_test_creature()
+        unit.tier_bonuses = [{"tier": 1, "abilities": ["Healing 2"], "healing_bonus": 3}]
+        unit.apply_tier_bonus(1)
+        assert unit.abilities == ["Healing 5"]
+        assert unit.healing_amt == 5
+
+    def test_healing_bonus_accepts_loose_healing_format(self):
+        """Test that a healing bonus finds a Healing ability not written as exactly 'Healing N'."""
+        unit = create_test_creature(abilities=["Flying", "Healing  3%"])
+        unit.tier_bonuses = [{"tier": 1, "healing_bonus": 1}]
+        unit.apply_tier_bonus(1)
+        assert unit.abilities == ["Flying", "Healing 4"]
+        assert unit.healing_amt == 4
+
+    def test_tier_bonus_attack_abilities_match_kind(self):
+        """Test that attack_abilities keyed by type name reach the matching attack."""
+        creature = create_test_creature(attacks=[Attack(attack_type="melee", damage=3),
+                                                 Attack(attack_type="ranged", damage=3)])
+        creature.tier_bonuses = [{"tier": 1, "attack_abilities": {"ranged": ["Splash"]}}]
+        creature.apply_tier_bonus(1)
+        assert creature.attacks[0].abilities == []
+        assert creature.attacks[1].abilities == ["Splash"]